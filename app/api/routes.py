@@ -1,6 +1,6 @@
 """API routes for LangGraph Agent Management System."""
 
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Header, status
 from typing import List, Optional, Dict, Any
 from app.models.schemas import (
     WorkflowCreate,
@@ -27,6 +27,7 @@ from app.services.workflow_service import WorkflowService
 from app.services.agent_service import AgentService
 from app.services.task_service import TaskService, IntelligenceLevel
 from app.services.persistence_service import PersistenceService
+from app.utils.errors import BaseAppException, WorkflowNotFoundError
 
 router = APIRouter()
 
@@ -61,7 +62,9 @@ async def root():
 async def create_workflow(workflow: WorkflowCreate):
     """Create a new workflow."""
     try:
-        return await workflow_service.create_workflow(workflow)
+        created = await workflow_service.create_workflow(workflow)
+        agent_service.register_workflow(created.id)
+        return created
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -105,10 +108,12 @@ async def delete_workflow(workflow_id: str):
 
 # Agent endpoints
 @router.post("/workflows/{workflow_id}/agents", response_model=AgentResponse, tags=["Agents"])
-async def create_agent(workflow_id: str, agent: AgentCreate):
+async def create_agent(workflow_id: str, agent: AgentCreate, idempotency_key: Optional[str] = Header(None)):
     """Create a new agent in a workflow."""
     try:
-        return await agent_service.create_agent(workflow_id, agent)
+        return await agent_service.create_agent(workflow_id, agent, idempotency_key=idempotency_key)
+    except WorkflowNotFoundError as e:
+        raise HTTPException(status_code=404, detail=e.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -262,34 +267,41 @@ async def spawn_child_agent(agent_id: str, child_agent: AgentCreate):
 
 @router.post("/agents/{agent_id}/delegate", tags=["Agents"])
 async def delegate_task(agent_id: str, delegation: Dict[str, Any]):
-    """Delegate a task from one agent to another connected agent."""
-    try:
-        # For this endpoint, we need to find the task first
-        # In a real implementation, you'd have a task service
-        # For now, we'll create a mock task for demonstration
-        from app.models.schemas import Task
-        import uuid
-        from datetime import datetime
-
-        # This is a simplified implementation - in production you'd retrieve the actual task
-        mock_task = Task(
-            id=delegation.get("task_id", ""),
-            title="Delegated Task",
-            description="Task delegated between agents",
-            status="pending",
-            priority=1,
-            created_at=datetime.now(),
-            assigned_to=delegation.get("target_agent_id", ""),
-        )
+    """Delegate a task from one agent to another connected agent.
+
+    Pass ``expected_version`` (the task version last read) to have a concurrent reassignment rejected with 409.
+    """
+    try:
+        task_id = delegation.get("task_id", "")
+        target_agent_id = delegation.get("target_agent_id", "")
+        expected_version = delegation.get("expected_version")
+        if expected_version is not None and (not isinstance(expected_version, int) or isinstance(expected_version, bool)):
+            raise HTTPException(status_code=422, detail="expected_version must be an integer")
+
+        # Delegate the agent's own copy of the task when it holds one, so versions carry across delegations
+        task = await agent_service.get_agent_task(agent_id, task_id)
+        if task is None:
+            from app.models.schemas import Task
+            from datetime import datetime
+
+            task = Task(
+                id=task_id,
+                title="Delegated Task",
+                description="Task delegated between agents",
+                status="pending",
+                priority=1,
+                created_at=datetime.now(),
+                assigned_to=target_agent_id,
+            )
 
-        result = await agent_service.delegate_task(agent_id, delegation.get("target_agent_id", ""), mock_task)
+        result = await agent_service.delegate_task(agent_id, target_agent_id, task, expected_version=expected_version)
         if not result:
             raise HTTPException(status_code=404, detail="One or both agents not found")
-        return {
-            "message": f"Task {delegation.get('task_id', '')} delegated from {agent_id} to {delegation.get('target_agent_id', '')}"
-        }
+        return {"message": f"Task {task_id} delegated from {agent_id} to {target_agent_id}", "version": task.version}
     except HTTPException:
         raise
+    except BaseAppException:
+        raise  # mapped to its HTTP status by the registered app exception handler
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
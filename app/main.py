@@ -2,11 +2,12 @@
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import router
+from app.api.routes import router, agent_service, task_service
 from app.api.langgraph_routes import router as langgraph_router
 from app.utils.logger import setup_logging
 from app.utils.config import get_settings
 from app.utils.errors import BaseAppException, app_exception_handler, general_exception_handler
+from app.services.llm_service import warm_token_encoder
 
 # Initialize logging
 setup_logging()
@@ -63,6 +64,21 @@ app.include_router(router)
 app.include_router(langgraph_router)
 
 
+@app.on_event("startup")
+async def warm_up_services():
+    """Load lazily fetched resources before the first request needs them."""
+    await warm_token_encoder()
+
+
+@app.on_event("shutdown")
+async def shutdown_services():
+    """Release shared service resources on shutdown."""
+    await agent_service.close()
+    await task_service.close()
+    if task_service.llm_service:
+        await task_service.llm_service.close()
+
+
 # Health check endpoint
 @app.get("/health", tags=["Health"])
 async def health_check():
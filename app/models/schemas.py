@@ -1,7 +1,7 @@
 """Pydantic models and schemas for LangGraph Agent Management System."""
 
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 from enum import Enum
 
@@ -99,6 +99,7 @@ class Task(BaseModel):
     priority: int = Field(1, ge=1, le=5, description="Task priority (1=highest, 5=lowest)")
     created_at: datetime = Field(default_factory=datetime.now, description="Task creation timestamp")
     assigned_to: Optional[str] = Field(None, description="Agent ID assigned to this task")
+    version: int = Field(0, ge=0, description="Assignment version, bumped on every delegation")
 
 
 # Agent models
@@ -304,6 +305,42 @@ class TaskExecution(BaseModel):
     started_at: Optional[datetime] = Field(None, description="Task start time")
     completed_at: Optional[datetime] = Field(None, description="Task completion time")
     created_at: datetime = Field(default_factory=datetime.now, description="Task creation time")
+    retries: int = Field(0, ge=0, description="Number of times this execution was retried")
+    llm_interactions: List[Dict[str, Any]] = Field(default_factory=list, description="LLM calls made for this task")
+
+    # field name -> (datetime it was formatted from, ISO string); not part of the serialized model
+    _iso_cache: Dict[str, Tuple[datetime, str]] = PrivateAttr(default_factory=dict)
+
+    def isoformat(self, field_name: str) -> Optional[str]:
+        """ISO string for a timestamp field, formatted once per assigned value."""
+        value = getattr(self, field_name)
+        if value is None:
+            return None
+        cached = self._iso_cache.get(field_name)
+        if cached is None or cached[0] is not value:
+            cached = self._iso_cache[field_name] = (value, value.isoformat())
+        return cached[1]
+
+    def record_llm_interaction(self, interaction: Dict[str, Any], limit: int = 20) -> None:
+        """Append an LLM interaction, keeping only the most recent ``limit`` entries."""
+        self.llm_interactions.append(interaction)
+        if len(self.llm_interactions) > limit:
+            del self.llm_interactions[:-limit]
+
+    def snapshot_for_llm(self) -> Dict[str, Any]:
+        """Small, fixed-size summary of this execution for LLM prompts (excludes task data and results)."""
+        duration = None
+        if self.started_at and self.completed_at:
+            duration = (self.completed_at - self.started_at).total_seconds()
+        return {
+            "status": self.status.value,
+            "agent_id": self.agent_id,
+            "retries": self.retries,
+            "error": self.error,
+            "started_at": self.isoformat("started_at"),
+            "completed_at": self.isoformat("completed_at"),
+            "duration_s": duration,
+        }
 
 
 class WorkflowPlan(BaseModel):
@@ -319,6 +356,17 @@ class WorkflowPlan(BaseModel):
     agent_count: int = Field(0, description="Number of agents in this workflow")
     agents: List[AgentResponse] = Field(default_factory=list, description="List of agents in this workflow")
 
+    # (steps list, its length when indexed, step_id -> step); rebuilt when steps is replaced or grows
+    _steps_index: Optional[Tuple[List[Dict[str, Any]], int, Dict[str, Dict[str, Any]]]] = PrivateAttr(None)
+
+    @property
+    def steps_by_id(self) -> Dict[str, Dict[str, Any]]:
+        """Steps keyed by step_id, indexed lazily so repeated lookups are O(1)."""
+        index = self._steps_index
+        if index is None or index[0] is not self.steps or index[1] != len(self.steps):
+            index = self._steps_index = (self.steps, len(self.steps), {step["step_id"]: step for step in self.steps})
+        return index[2]
+
 
 class WorkflowList(BaseModel):
     """Workflow list response model."""
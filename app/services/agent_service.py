@@ -1,8 +1,15 @@
 """Agent service for managing LangGraph agents."""
 
+import os
+import json
 import uuid
 import asyncio
-from typing import List, Optional, Dict, Any
+import hashlib
+import aiohttp
+from types import MappingProxyType
+from typing import List, Optional, Dict, Any, Set
+from urllib.parse import urlparse
+from dataclasses import dataclass, field
 from datetime import datetime
 from app.models.schemas import (
     AgentCreate,
@@ -14,9 +21,9 @@ from app.models.schemas import (
     AgentStatusEnum,
     Task,
     TaskCreate,
-    Agent,
+    LLMConfig,
 )
-from app.utils.logger import LoggerMixin, log_agent_event
+from app.utils.logger import LoggerMixin, log_agent_event, log_agent_events
 from app.utils.config import get_settings
 from app.utils.errors import (
     AgentNotFoundError,
@@ -24,35 +31,142 @@ from app.utils.errors import (
     AgentLimitExceededError,
     AgentConnectionError,
     AgentSpawnError,
+    ConcurrentDelegationError,
     WorkflowNotFoundError,
     handle_service_error,
 )
 
+# Faster JSON decoding for API and file agent payloads
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+    _json_loads = orjson.loads
+except ImportError:
+    ORJSON_AVAILABLE = False
+    _json_loads = json.loads
+
+# HTTP methods supported by API agent tasks, and those that carry a JSON body
+_ALLOWED_METHODS = frozenset({"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD"})
+_BODY_METHODS = frozenset({"POST", "PUT", "PATCH"})
+
+# Placeholder resource metrics shared by every status report until real metrics are wired in
+_STATIC_RESOURCE_USAGE = {"cpu_percent": 25.5, "memory_mb": 128.7}
+
+# Shared read-only stand-in for agents with no connection entry
+_NO_CONNECTIONS = MappingProxyType({})
+
+
+def _cas_assign(task: Task, expected_version: Optional[int], new_assignee: str) -> bool:
+    """Reassign ``task`` only if nobody has bumped its version since ``expected_version`` was read.
+
+    With no ``expected_version`` the reassignment is unconditional (the version is still bumped).
+    """
+    if expected_version is not None and task.version != expected_version:
+        return False
+    task.version += 1
+    task.assigned_to = new_assignee
+    return True
+
+
+@dataclass(slots=True)
+class _AgentInternal:
+    """In-memory agent record owned by AgentService.
+
+    Mirrors the ``Agent`` schema without Pydantic validation: inputs are validated once as
+    ``AgentCreate`` at the API boundary, and ``AgentResponse`` is built on the way out.
+    Connections live only in ``AgentService._agent_connections``.
+    """
+
+    id: str
+    workflow_id: str
+    name: str
+    description: Optional[str]
+    agent_type: AgentType
+    status: AgentStatusEnum
+    status_description: str
+    status_updated_at: datetime
+    created_at: datetime
+    last_activity: Optional[datetime]
+    llm_config: Optional[LLMConfig]
+    max_child_agents: int
+    parent_agent_id: Optional[str] = None
+    tasks: List[Task] = field(default_factory=list)
+    tasks_by_id: Dict[str, Task] = field(default_factory=dict)  # index over tasks, first task wins per ID
+    child_agents: List[str] = field(default_factory=list)
+    capabilities: List[str] = field(default_factory=list)
+    config: Dict[str, Any] = field(default_factory=dict)
+
 
 class AgentService(LoggerMixin):
     """Service for managing LangGraph agents."""
 
+    _DEFAULT_STATUS_DESCRIPTIONS = {
+        AgentStatusEnum.IDLE: "Agent is idle and ready for tasks",
+        AgentStatusEnum.RUNNING: "Agent is actively processing tasks",
+        AgentStatusEnum.PAUSED: "Agent is paused and not processing tasks",
+        AgentStatusEnum.ERROR: "Agent encountered an error",
+        AgentStatusEnum.COMPLETED: "Agent has completed all assigned tasks",
+    }
+
     def __init__(self, workflow_service=None):
         # In-memory storage for MVP (would be replaced with database)
-        self._agents: Dict[str, Agent] = {}
-        self._agent_connections: Dict[str, List[str]] = {}  # agent_id -> [connected_agent_ids]
-        self._workflow_agents: Dict[str, List[str]] = {}  # workflow_id -> [agent_ids]
+        self._agents: Dict[str, _AgentInternal] = {}
+        # agent_id -> {connected_agent_id: connected agent}; keys act as the neighbour set, values skip re-lookups
+        self._agent_connections: Dict[str, Dict[str, _AgentInternal]] = {}
+        self._workflow_agents: Dict[str, Set[str]] = {}  # workflow_id -> {agent_ids}
+        self._workflow_agents_ordered: Dict[str, List[str]] = {}  # workflow_id -> [agent_ids] in creation order
+        self._agent_workflow: Dict[str, str] = {}  # agent_id -> workflow_id
+        self._uuid_buf: List[str] = []  # pre-generated IDs, refilled in batches
+        self._create_cache: Dict[str, str] = {}  # payload digest -> agent_id (idempotent creates)
+        self._create_cache_keys: Dict[str, str] = {}  # agent_id -> its payload digest, to drop it on delete
+        self._known_workflow_ids: Set[str] = set()  # workflows already confirmed to exist
         self.settings = get_settings()
         self.workflow_service = workflow_service
+        self._http_session = None  # shared aiohttp.ClientSession, created lazily
+        self._host_sem_limit = 10  # max in-flight API task requests per host
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+        # Handler dispatch tables (agent type / action -> handler)
+        self._type_dispatch = {
+            AgentType.API_AGENT: self._execute_api_task,
+            AgentType.DATA_AGENT: self._execute_data_task,
+            AgentType.FILE_AGENT: self._execute_file_task,
+            AgentType.NOTIFICATION_AGENT: self._execute_notification_task,
+        }
+        self._data_actions = {"transform": self._data_transform, "validate": self._data_validate}
+        self._file_actions = {"read": self._file_read, "write": self._file_write, "json_read": self._file_json_read}
         self.logger.info("AgentService initialized")
 
     @handle_service_error
-    async def create_agent(self, workflow_id: str, agent_data: AgentCreate) -> AgentResponse:
-        """Create a new agent within a workflow."""
-        # Validate workflow exists (only if workflow_service is available)
-        if self.workflow_service and not self.workflow_service.get_workflow(workflow_id):
-            raise ValueError(f"Workflow {workflow_id} not found")
+    async def create_agent(
+        self, workflow_id: str, agent_data: AgentCreate, idempotency_key: Optional[str] = None
+    ) -> AgentResponse:
+        """Create a new agent within a workflow.
+
+        When an idempotency key is supplied, repeating the same key with an identical
+        payload returns the agent created by the first request instead of a new one.
+        """
+        # Validate workflow exists (only if workflow_service is available); confirmed IDs are cached
+        if self.workflow_service and workflow_id not in self._known_workflow_ids:
+            if not await self.workflow_service.get_workflow(workflow_id):
+                raise WorkflowNotFoundError(workflow_id)
+            self._known_workflow_ids.add(workflow_id)
+
+        cache_key = None
+        if idempotency_key:
+            cache_key = self._create_cache_key(workflow_id, agent_data, idempotency_key)
+            cached_agent = self._agents.get(self._create_cache.get(cache_key, ""))
+            if cached_agent:
+                self.logger.info("Returning existing agent %s for idempotent create", cached_agent.id)
+                return self._agent_to_response(cached_agent)
 
         # Generate unique agent ID
-        agent_id = str(uuid.uuid4())
+        agent_id = self._next_id()
 
         # Create agent with enhanced configuration
-        agent = Agent(
+        now = datetime.now()
+        agent = _AgentInternal(
             id=agent_id,
             workflow_id=workflow_id,
             name=agent_data.name,
@@ -60,43 +174,49 @@ class AgentService(LoggerMixin):
             agent_type=agent_data.agent_type,
             status=AgentStatusEnum.IDLE,
             status_description="Agent created and ready to receive tasks",
-            created_at=datetime.now(),
-            last_activity=datetime.now(),
-            tasks=[],
-            child_agents=[],
-            parent_agent_id=None,
-            connected_agents=[],
-            capabilities=agent_data.capabilities or [],
-            config=agent_data.config or {},
+            status_updated_at=now,
+            created_at=now,
+            last_activity=now,
+            capabilities=list(agent_data.capabilities or []),
+            config=dict(agent_data.config or {}),
             llm_config=agent_data.llm_config,
             max_child_agents=agent_data.max_child_agents,
         )
 
         # Store agent
         self._agents[agent_id] = agent
+        self._agent_workflow[agent_id] = workflow_id
 
         # Add to workflow agents
-        if workflow_id not in self._workflow_agents:
-            self._workflow_agents[workflow_id] = []
-        self._workflow_agents[workflow_id].append(agent_id)
+        self._workflow_agents.setdefault(workflow_id, set()).add(agent_id)
+        self._workflow_agents_ordered.setdefault(workflow_id, []).append(agent_id)
 
         # Initialize agent connections
-        self._agent_connections[agent_id] = []
+        self._agent_connections[agent_id] = {}
+
+        if cache_key:
+            self._create_cache[cache_key] = agent_id
+            self._create_cache_keys[agent_id] = cache_key
 
         # Log creation
         log_agent_event(
             agent_id,
             "created",
-            {"workflow_id": workflow_id, "agent_type": agent_data.agent_type, "capabilities": agent_data.capabilities},
+            lambda: {"workflow_id": workflow_id, "agent_type": agent_data.agent_type, "capabilities": agent_data.capabilities},
         )
 
-        self.logger.info(f"Created agent {agent_id} in workflow {workflow_id}")
+        self.logger.info("Created agent %s in workflow %s", agent_id, workflow_id)
 
         return self._agent_to_response(agent)
 
-    def _agent_to_response(self, agent: Agent) -> AgentResponse:
-        """Convert Agent model to AgentResponse."""
-        return AgentResponse(
+    def _agent_to_response(self, agent: _AgentInternal) -> AgentResponse:
+        """Convert an internal agent record to AgentResponse.
+
+        The stored agent was validated on creation, so the response is built with
+        ``model_construct`` to skip re-validation. Mutable containers are copied so the
+        response is a snapshot rather than a live view of the agent.
+        """
+        return AgentResponse.model_construct(
             id=agent.id,
             workflow_id=agent.workflow_id,
             name=agent.name,
@@ -111,11 +231,11 @@ class AgentService(LoggerMixin):
             status_updated_at=agent.status_updated_at,
             created_at=agent.created_at,
             last_activity=agent.last_activity,
-            connected_agents=agent.connected_agents,
-            child_agents=agent.child_agents,
-            tasks=agent.tasks,
-            capabilities=agent.capabilities,
-            config=agent.config,
+            connected_agents=list(self._agent_connections.get(agent.id, _NO_CONNECTIONS)),
+            child_agents=list(agent.child_agents),
+            tasks=list(agent.tasks),
+            capabilities=list(agent.capabilities),
+            config=dict(agent.config),
         )
 
     @handle_service_error
@@ -140,7 +260,7 @@ class AgentService(LoggerMixin):
             log_agent_event(
                 agent_id,
                 "task_execution_started",
-                {
+                lambda: {
                     "action": action,
                     "intelligence_level": intelligence_level,
                     "step_id": step_context.get("step_id", "unknown"),
@@ -158,10 +278,10 @@ class AgentService(LoggerMixin):
             log_agent_event(
                 agent_id,
                 "task_execution_completed",
-                {"action": action, "result_keys": list(result.keys()) if isinstance(result, dict) else "non_dict_result"},
+                lambda: {"action": action, "result_size": len(result) if isinstance(result, dict) else 0},
             )
 
-            self.logger.info(f"Agent {agent_id} completed task: {action}")
+            self.logger.info("Agent %s completed task: %s", agent_id, action)
 
             return result
 
@@ -171,149 +291,157 @@ class AgentService(LoggerMixin):
             agent.last_activity = datetime.now()
 
             # Log error
-            log_agent_event(agent_id, "task_execution_failed", {"action": action, "error": str(e)})
+            log_agent_event(agent_id, "task_execution_failed", lambda: {"action": action, "error": str(e)})
 
-            self.logger.error(f"Agent {agent_id} task execution failed: {e}")
+            self.logger.error("Agent %s task execution failed: %s", agent_id, e)
             raise
 
     async def _execute_by_agent_type(
-        self, agent: Agent, action: str, inputs: Dict[str, Any], step_context: Dict[str, Any], intelligence_level: str
+        self, agent: _AgentInternal, action: str, inputs: Dict[str, Any], step_context: Dict[str, Any], intelligence_level: str
     ) -> Dict[str, Any]:
         """Execute task based on agent type."""
-        agent_type = agent.agent_type
-
-        if agent_type == "api_agent":
-            return await self._execute_api_task(agent, action, inputs, step_context, intelligence_level)
-        elif agent_type == "data_agent":
-            return await self._execute_data_task(agent, action, inputs, step_context, intelligence_level)
-        elif agent_type == "file_agent":
-            return await self._execute_file_task(agent, action, inputs, step_context, intelligence_level)
-        elif agent_type == "notification_agent":
-            return await self._execute_notification_task(agent, action, inputs, step_context, intelligence_level)
-        else:
-            # General agent - basic task execution
-            return await self._execute_general_task(agent, action, inputs, step_context, intelligence_level)
+        # Unknown types fall back to general agent - basic task execution
+        handler = self._type_dispatch.get(agent.agent_type, self._execute_general_task)
+        return await handler(agent, action, inputs, step_context, intelligence_level)
 
     async def _execute_api_task(
-        self, agent: Agent, action: str, inputs: Dict[str, Any], step_context: Dict[str, Any], intelligence_level: str
+        self, agent: _AgentInternal, action: str, inputs: Dict[str, Any], step_context: Dict[str, Any], intelligence_level: str
     ) -> Dict[str, Any]:
         """Execute API-related tasks."""
-        import aiohttp
-
         try:
             method = inputs.get("method", "GET").upper()
             url = inputs.get("url", "")
             headers = inputs.get("headers", {})
             data = inputs.get("data", {})
-            timeout = inputs.get("timeout", 30)
+            timeout = aiohttp.ClientTimeout(total=inputs.get("timeout", 30))
 
             if not url:
                 raise ValueError("URL is required for API tasks")
 
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
-                if method == "GET":
-                    async with session.get(url, headers=headers) as response:
-                        result = await response.json()
-                elif method == "POST":
-                    async with session.post(url, headers=headers, json=data) as response:
-                        result = await response.json()
-                elif method == "PUT":
-                    async with session.put(url, headers=headers, json=data) as response:
-                        result = await response.json()
-                elif method == "DELETE":
-                    async with session.delete(url, headers=headers) as response:
-                        result = await response.json()
-                else:
-                    raise ValueError(f"Unsupported HTTP method: {method}")
+            if method not in _ALLOWED_METHODS:
+                raise ValueError(f"Unsupported HTTP method: {method}")
+
+            session = await self._get_session()
+            body = data if method in _BODY_METHODS else None
+            host = urlparse(url).netloc
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = self._host_semaphores[host] = asyncio.Semaphore(self._host_sem_limit)
 
-                return {"status": "success", "status_code": response.status, "data": result, "headers": dict(response.headers)}
+            # Bound concurrent requests per host so bursts queue instead of tripping connection resets
+            async with semaphore:
+                async with session.request(method, url, headers=headers, json=body, timeout=timeout) as response:
+                    raw = await response.read() if method != "HEAD" else b""
+            result = _json_loads(raw) if raw else None
+
+            return {"status": "success", "status_code": response.status, "data": result, "headers": dict(response.headers)}
 
         except Exception as e:
             return {"status": "error", "error": str(e), "action": action}
 
+    async def _get_session(self):
+        """Return the shared HTTP session, creating it on first use."""
+        if self._http_session is None or self._http_session.closed:
+            connector = aiohttp.TCPConnector(limit=100, limit_per_host=self._host_sem_limit, ttl_dns_cache=300)
+            self._http_session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=30))
+        return self._http_session
+
+    async def close(self) -> None:
+        """Release the shared HTTP session."""
+        if self._http_session is not None and not self._http_session.closed:
+            await self._http_session.close()
+        self._http_session = None
+
     async def _execute_data_task(
-        self, agent: Agent, action: str, inputs: Dict[str, Any], step_context: Dict[str, Any], intelligence_level: str
+        self, agent: _AgentInternal, action: str, inputs: Dict[str, Any], step_context: Dict[str, Any], intelligence_level: str
     ) -> Dict[str, Any]:
         """Execute data processing tasks."""
+        handler = self._data_actions.get(action)
+        if handler is None:
+            return {"status": "error", "error": f"Unknown data action: {action}"}
+
         try:
-            if action == "transform":
-                data = inputs.get("data", {})
-                transformation = inputs.get("transformation", "")
-
-                # Simple data transformation examples
-                if transformation == "uppercase":
-                    result = {k: v.upper() if isinstance(v, str) else v for k, v in data.items()}
-                elif transformation == "filter_empty":
-                    result = {k: v for k, v in data.items() if v}
-                elif transformation == "extract_keys":
-                    keys = inputs.get("keys", [])
-                    result = {k: data.get(k) for k in keys if k in data}
-                else:
-                    result = data
+            return handler(inputs)
+        except Exception as e:
+            return {"status": "error", "error": str(e), "action": action}
 
-                return {"status": "success", "data": result, "transformation": transformation}
+    def _data_transform(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply a simple named transformation to a data dict."""
+        data = inputs.get("data", {})
+        transformation = inputs.get("transformation", "")
+
+        # Simple data transformation examples
+        if transformation == "uppercase":
+            result = {k: v.upper() if isinstance(v, str) else v for k, v in data.items()}
+        elif transformation == "filter_empty":
+            result = {k: v for k, v in data.items() if v}
+        elif transformation == "extract_keys":
+            keys = inputs.get("keys", [])
+            result = {k: data.get(k) for k in keys if k in data}
+        else:
+            result = data
 
-            elif action == "validate":
-                data = inputs.get("data", {})
-                schema = inputs.get("schema", {})
+        return {"status": "success", "data": result, "transformation": transformation}
 
-                # Simple validation
-                valid = all(key in data for key in schema.get("required", []))
+    def _data_validate(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Check that a data dict contains the schema's required keys."""
+        data = inputs.get("data", {})
+        schema = inputs.get("schema", {})
 
-                return {"status": "success", "valid": valid, "data": data}
+        # Simple validation
+        valid = all(key in data for key in schema.get("required", []))
 
-            else:
-                return {"status": "error", "error": f"Unknown data action: {action}"}
-
-        except Exception as e:
-            return {"status": "error", "error": str(e), "action": action}
+        return {"status": "success", "valid": valid, "data": data}
 
     async def _execute_file_task(
-        self, agent: Agent, action: str, inputs: Dict[str, Any], step_context: Dict[str, Any], intelligence_level: str
+        self, agent: _AgentInternal, action: str, inputs: Dict[str, Any], step_context: Dict[str, Any], intelligence_level: str
     ) -> Dict[str, Any]:
         """Execute file operation tasks."""
-        import os
-        import json
+        handler = self._file_actions.get(action)
+        if handler is None:
+            return {"status": "error", "error": f"Unknown file action: {action}"}
 
         try:
-            if action == "read":
-                file_path = inputs.get("file_path", "")
-                if not file_path or not os.path.exists(file_path):
-                    raise ValueError(f"File not found: {file_path}")
-
-                with open(file_path, "r") as f:
-                    content = f.read()
+            # File handlers do blocking I/O; run them off the event loop thread
+            return await asyncio.to_thread(handler, inputs)
+        except Exception as e:
+            return {"status": "error", "error": str(e), "action": action}
 
-                return {"status": "success", "content": content, "file_path": file_path}
+    def _file_read(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Read a text file."""
+        file_path = inputs.get("file_path", "")
+        if not file_path or not os.path.exists(file_path):
+            raise ValueError(f"File not found: {file_path}")
 
-            elif action == "write":
-                file_path = inputs.get("file_path", "")
-                content = inputs.get("content", "")
+        with open(file_path, "r") as f:
+            content = f.read()
 
-                os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                with open(file_path, "w") as f:
-                    f.write(content)
+        return {"status": "success", "content": content, "file_path": file_path}
 
-                return {"status": "success", "file_path": file_path, "bytes_written": len(content.encode())}
+    def _file_write(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Write a text file, creating parent directories as needed."""
+        file_path = inputs.get("file_path", "")
+        content = inputs.get("content", "")
 
-            elif action == "json_read":
-                file_path = inputs.get("file_path", "")
-                if not file_path or not os.path.exists(file_path):
-                    raise ValueError(f"File not found: {file_path}")
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "w") as f:
+            f.write(content)
 
-                with open(file_path, "r") as f:
-                    data = json.load(f)
+        return {"status": "success", "file_path": file_path, "bytes_written": len(content.encode())}
 
-                return {"status": "success", "data": data, "file_path": file_path}
+    def _file_json_read(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Read and parse a JSON file."""
+        file_path = inputs.get("file_path", "")
+        if not file_path or not os.path.exists(file_path):
+            raise ValueError(f"File not found: {file_path}")
 
-            else:
-                return {"status": "error", "error": f"Unknown file action: {action}"}
+        with open(file_path, "rb") as f:
+            data = _json_loads(f.read())
 
-        except Exception as e:
-            return {"status": "error", "error": str(e), "action": action}
+        return {"status": "success", "data": data, "file_path": file_path}
 
     async def _execute_notification_task(
-        self, agent: Agent, action: str, inputs: Dict[str, Any], step_context: Dict[str, Any], intelligence_level: str
+        self, agent: _AgentInternal, action: str, inputs: Dict[str, Any], step_context: Dict[str, Any], intelligence_level: str
     ) -> Dict[str, Any]:
         """Execute notification tasks."""
         try:
@@ -322,11 +450,11 @@ class AgentService(LoggerMixin):
                 level = inputs.get("level", "info")
 
                 if level == "error":
-                    self.logger.error(f"Agent notification: {message}")
+                    self.logger.error("Agent notification: %s", message)
                 elif level == "warning":
-                    self.logger.warning(f"Agent notification: {message}")
+                    self.logger.warning("Agent notification: %s", message)
                 else:
-                    self.logger.info(f"Agent notification: {message}")
+                    self.logger.info("Agent notification: %s", message)
 
                 return {"status": "success", "message": message, "level": level}
 
@@ -337,7 +465,7 @@ class AgentService(LoggerMixin):
                 body = inputs.get("body", "")
 
                 # In a real implementation, this would send an email
-                self.logger.info(f"Email notification: {recipient} - {subject}")
+                self.logger.info("Email notification: %s - %s", recipient, subject)
 
                 return {"status": "success", "recipient": recipient, "subject": subject, "sent": True}
 
@@ -348,7 +476,7 @@ class AgentService(LoggerMixin):
             return {"status": "error", "error": str(e), "action": action}
 
     async def _execute_general_task(
-        self, agent: Agent, action: str, inputs: Dict[str, Any], step_context: Dict[str, Any], intelligence_level: str
+        self, agent: _AgentInternal, action: str, inputs: Dict[str, Any], step_context: Dict[str, Any], intelligence_level: str
     ) -> Dict[str, Any]:
         """Execute general tasks."""
         try:
@@ -376,51 +504,28 @@ class AgentService(LoggerMixin):
         if not agent:
             return None
 
-        # Update connected agents list
-        agent.connected_agents = self._agent_connections.get(agent_id, [])
-
         log_agent_event(agent_id, "retrieved")
         return self._agent_to_response(agent)
 
     @handle_service_error
     async def list_agents(self, workflow_id: str) -> AgentList:
         """List all agents in a workflow."""
-        agent_ids = self._workflow_agents.get(workflow_id, [])
-        agents = []
-
-        for agent_id in agent_ids:
-            agent = self._agents.get(agent_id)
-            if agent:
-                # Update connected agents list
-                agent.connected_agents = self._agent_connections.get(agent_id, [])
-                # Convert Agent to AgentResponse
-                agent_response = AgentResponse(
-                    id=agent.id,
-                    workflow_id=agent.workflow_id,
-                    name=agent.name,
-                    description=agent.description,
-                    agent_type=agent.agent_type,
-                    status=agent.status,
-                    status_description=agent.status_description,
-                    status_updated_at=agent.status_updated_at,
-                    created_at=agent.created_at,
-                    last_activity=agent.last_activity,
-                    parent_agent_id=agent.parent_agent_id,
-                    connected_agents=agent.connected_agents,
-                    child_agents=agent.child_agents,
-                    tasks=agent.tasks,
-                    capabilities=agent.capabilities,
-                    config=agent.config,
-                    llm_config=agent.llm_config,
-                    max_child_agents=agent.max_child_agents,
-                )
-                agents.append(agent_response)
+        members = self._workflow_agents.get(workflow_id)
+        if not members:
+            return AgentList.model_construct(agents=[], total=0)
 
-        # Sort by creation date (newest first)
-        agents.sort(key=lambda a: a.created_at, reverse=True)
+        # Creation order is kept in a parallel list; deletions only touch the set, so compact lazily
+        ordered = self._workflow_agents_ordered.get(workflow_id, [])
+        if len(ordered) != len(members):
+            ordered = [agent_id for agent_id in ordered if agent_id in members]
+            self._workflow_agents_ordered[workflow_id] = ordered
 
-        self.logger.info(f"Listed {len(agents)} agents in workflow: {workflow_id}")
-        return AgentList(agents=agents, total=len(agents))
+        agents_map = self._agents
+        # Newest first: walk creation order backwards instead of sorting by created_at
+        agents = [self._agent_to_response(agents_map[agent_id]) for agent_id in reversed(ordered) if agent_id in agents_map]
+
+        self.logger.info("Listed %s agents in workflow: %s", len(agents), workflow_id)
+        return AgentList.model_construct(agents=agents, total=len(agents))
 
     @handle_service_error
     async def update_agent(self, agent_id: str, updates: Dict[str, Any]) -> Optional[AgentResponse]:
@@ -433,55 +538,70 @@ class AgentService(LoggerMixin):
         for field, value in updates.items():
             if hasattr(agent, field):
                 setattr(agent, field, value)
+        if "tasks" in updates:
+            agent.tasks_by_id = {}
+            for task in agent.tasks:
+                agent.tasks_by_id.setdefault(task.id, task)
 
         # Update last activity
         agent.last_activity = datetime.now()
 
         log_agent_event(agent_id, "updated", updates)
-        self.logger.info(f"Updated agent: {agent_id}")
+        self.logger.info("Updated agent: %s", agent_id)
         return self._agent_to_response(agent)
 
     @handle_service_error
     async def delete_agent(self, agent_id: str) -> bool:
-        """Delete an agent."""
+        """Delete an agent and all of its descendants."""
         agent = self._agents.get(agent_id)
         if not agent:
             return False
 
         try:
-            # Remove from workflow
-            workflow_id = agent.workflow_id
-            if workflow_id in self._workflow_agents:
-                if agent_id in self._workflow_agents[workflow_id]:
-                    self._workflow_agents[workflow_id].remove(agent_id)
-
-            # Remove connections
-            if agent_id in self._agent_connections:
-                # Remove this agent from other agents' connection lists
-                for other_agent_id, connections in self._agent_connections.items():
-                    if agent_id in connections:
-                        connections.remove(agent_id)
-                        # Update the other agent's connected_agents list
-                        if other_agent_id in self._agents:
-                            self._agents[other_agent_id].connected_agents = connections.copy()
-
-                # Remove this agent's connections
-                del self._agent_connections[agent_id]
-
-            # Delete child agents
-            for child_id in agent.child_agents:
-                await self.delete_agent(child_id)
-
-            # Remove from storage
-            del self._agents[agent_id]
-
-            log_agent_event(agent_id, "deleted", {"workflow_id": workflow_id, "name": agent.name})
-
-            self.logger.info(f"Deleted agent: {agent_id}")
+            # Collect the agent and its descendants iteratively (no per-child recursion)
+            to_delete: List[_AgentInternal] = []
+            seen = {agent_id}
+            stack = [agent]
+            while stack:
+                current = stack.pop()
+                to_delete.append(current)
+                for child_id in current.child_agents:
+                    child = self._agents.get(child_id)
+                    if child and child_id not in seen:
+                        seen.add(child_id)
+                        stack.append(child)
+
+            for doomed in to_delete:
+                doomed_id = doomed.id
+
+                # Remove from workflow
+                members = self._workflow_agents.get(doomed.workflow_id)
+                if members is not None:
+                    members.discard(doomed_id)
+                    if not members:
+                        self._drop_workflow_index(doomed.workflow_id)
+
+                # Remove connections; connections are symmetric, so only this agent's neighbours need patching
+                for neighbor_id in self._agent_connections.pop(doomed_id, ()):
+                    neighbor_connections = self._agent_connections.get(neighbor_id)
+                    if neighbor_connections is not None:
+                        neighbor_connections.pop(doomed_id, None)
+
+                # Remove from storage
+                del self._agents[doomed_id]
+                self._agent_workflow.pop(doomed_id, None)
+                cache_key = self._create_cache_keys.pop(doomed_id, None)
+                if cache_key is not None:
+                    self._create_cache.pop(cache_key, None)
+
+            for doomed in to_delete:
+                log_agent_event(doomed.id, "deleted", lambda: {"workflow_id": doomed.workflow_id, "name": doomed.name})
+
+            self.logger.info("Deleted agent: %s (%s including descendants)", agent_id, len(to_delete))
             return True
 
         except Exception as e:
-            self.logger.error(f"Failed to delete agent {agent_id}: {str(e)}")
+            self.logger.error("Failed to delete agent %s: %s", agent_id, e)
             return False
 
     @handle_service_error
@@ -494,34 +614,26 @@ class AgentService(LoggerMixin):
             return False
 
         # Check if agents are in the same workflow
-        if agent.workflow_id != target_agent.workflow_id:
+        if self._agent_workflow[agent_id] != self._agent_workflow[target_agent_id]:
             raise AgentConnectionError(agent_id, target_agent_id, "Agents must be in the same workflow")
 
         # Prevent self-connection
         if agent_id == target_agent_id:
             raise AgentConnectionError(agent_id, target_agent_id, "Agent cannot connect to itself")
 
+        # Connections are symmetric, so an existing edge in one direction means nothing to do
+        agent_connections = self._agent_connections.setdefault(agent_id, {})
+        if target_agent_id in agent_connections:
+            return True
+
         # Add bidirectional connection
-        if agent_id not in self._agent_connections:
-            self._agent_connections[agent_id] = []
-        if target_agent_id not in self._agent_connections:
-            self._agent_connections[target_agent_id] = []
-
-        # Add connections if not already present
-        if target_agent_id not in self._agent_connections[agent_id]:
-            self._agent_connections[agent_id].append(target_agent_id)
-        if agent_id not in self._agent_connections[target_agent_id]:
-            self._agent_connections[target_agent_id].append(agent_id)
-
-        # Update both agents' connected_agents lists
-        agent.connected_agents = self._agent_connections[agent_id]
-        target_agent.connected_agents = self._agent_connections[target_agent_id]
-        agent.last_activity = datetime.now()
-        target_agent.last_activity = datetime.now()
+        agent_connections[target_agent_id] = target_agent
+        self._agent_connections.setdefault(target_agent_id, {})[agent_id] = agent
+        agent.last_activity = target_agent.last_activity = datetime.now()
 
-        log_agent_event(agent_id, "connected", {"target_agent_id": target_agent_id, "workflow_id": agent.workflow_id})
+        log_agent_event(agent_id, "connected", lambda: {"target_agent_id": target_agent_id, "workflow_id": agent.workflow_id})
 
-        self.logger.info(f"Connected agents bidirectionally: {agent_id} <-> {target_agent_id}")
+        self.logger.info("Connected agents bidirectionally: %s <-> %s", agent_id, target_agent_id)
         return True
 
     @handle_service_error
@@ -533,32 +645,21 @@ class AgentService(LoggerMixin):
         if not agent or not target_agent:
             return False
 
-        # Check if agents are actually connected
-        agent_connections = self._agent_connections.get(agent_id, [])
-        target_connections = self._agent_connections.get(target_agent_id, [])
-
-        if target_agent_id not in agent_connections and agent_id not in target_connections:
-            # Agents are not connected
+        # Check if agents are actually connected (connections are symmetric)
+        agent_connections = self._agent_connections.get(agent_id)
+        if not agent_connections or target_agent_id not in agent_connections:
             return False
 
         # Remove bidirectional connection
-        if agent_id in self._agent_connections:
-            if target_agent_id in self._agent_connections[agent_id]:
-                self._agent_connections[agent_id].remove(target_agent_id)
-
-        if target_agent_id in self._agent_connections:
-            if agent_id in self._agent_connections[target_agent_id]:
-                self._agent_connections[target_agent_id].remove(agent_id)
+        del agent_connections[target_agent_id]
+        self._agent_connections.get(target_agent_id, {}).pop(agent_id, None)
+        agent.last_activity = target_agent.last_activity = datetime.now()
 
-        # Update both agents' connected_agents lists
-        agent.connected_agents = self._agent_connections.get(agent_id, [])
-        target_agent.connected_agents = self._agent_connections.get(target_agent_id, [])
-        agent.last_activity = datetime.now()
-        target_agent.last_activity = datetime.now()
-
-        log_agent_event(agent_id, "disconnected", {"target_agent_id": target_agent_id, "workflow_id": agent.workflow_id})
+        log_agent_event(
+            agent_id, "disconnected", lambda: {"target_agent_id": target_agent_id, "workflow_id": agent.workflow_id}
+        )
 
-        self.logger.info(f"Disconnected agents: {agent_id} <-> {target_agent_id}")
+        self.logger.info("Disconnected agents: %s <-> %s", agent_id, target_agent_id)
         return True
 
     @handle_service_error
@@ -568,15 +669,9 @@ class AgentService(LoggerMixin):
         if not agent:
             return []
 
-        connected_agent_ids = self._agent_connections.get(agent_id, [])
-        connected_agents = []
-
-        for connected_id in connected_agent_ids:
-            connected_agent = self._agents.get(connected_id)
-            if connected_agent:
-                connected_agents.append(connected_agent)
+        connected_agents = list(self._agent_connections.get(agent_id, _NO_CONNECTIONS).values())
 
-        self.logger.info(f"Retrieved {len(connected_agents)} connected agents for: {agent_id}")
+        self.logger.info("Retrieved %s connected agents for: %s", len(connected_agents), agent_id)
         return [self._agent_to_response(a) for a in connected_agents]
 
     @handle_service_error
@@ -586,24 +681,29 @@ class AgentService(LoggerMixin):
         if not agent:
             return None
 
-        # Calculate task statistics
-        active_tasks = len([t for t in agent.tasks if t.status == "running"])
-        completed_tasks = len([t for t in agent.tasks if t.status == "completed"])
+        # Calculate task statistics in a single pass without building throwaway lists
+        active_tasks = completed_tasks = 0
+        for task in agent.tasks:
+            if task.status == "running":
+                active_tasks += 1
+            elif task.status == "completed":
+                completed_tasks += 1
 
         # Mock resource usage (in real implementation, would get actual metrics)
+        connected = list(self._agent_connections.get(agent_id, _NO_CONNECTIONS))
         resource_usage = {
-            "cpu_percent": 25.5,
-            "memory_mb": 128.7,
-            "active_connections": len(agent.connected_agents),
+            **_STATIC_RESOURCE_USAGE,
+            "active_connections": len(connected),
             "uptime_seconds": (datetime.now() - agent.created_at).total_seconds(),
         }
 
-        status = AgentStatus(
+        # Every field comes from already-validated agent state, so skip re-validation
+        status = AgentStatus.model_construct(
             agent_id=agent_id,
             status=agent.status,
             last_activity=agent.last_activity,
             resource_usage=resource_usage,
-            connected_agents=self._agent_connections.get(agent_id, []),
+            connected_agents=connected,
             active_tasks=active_tasks,
             completed_tasks=completed_tasks,
         )
@@ -633,9 +733,9 @@ class AgentService(LoggerMixin):
         parent.child_agents.append(child_agent.id)
         parent.last_activity = datetime.now()
 
-        log_agent_event(parent_id, "spawned_child", {"child_agent_id": child_agent.id, "child_name": child_agent.name})
+        log_agent_event(parent_id, "spawned_child", lambda: {"child_agent_id": child_agent.id, "child_name": child_agent.name})
 
-        self.logger.info(f"Spawned child agent: {child_agent.id} from parent: {parent_id}")
+        self.logger.info("Spawned child agent: %s from parent: %s", child_agent.id, parent_id)
         return child_agent
 
     @handle_service_error
@@ -648,7 +748,7 @@ class AgentService(LoggerMixin):
         # Defensive programming: Handle case where AgentStatusEnum is passed instead of AgentStatusUpdate
         # This can happen due to incorrect method calls or type confusion
         if isinstance(status_update, AgentStatusEnum):
-            self.logger.warning(f"AgentStatusEnum passed to update_agent_status instead of AgentStatusUpdate. Converting automatically.")
+            self.logger.warning("AgentStatusEnum passed to update_agent_status instead of AgentStatusUpdate. Converting automatically.")
             status_update = AgentStatusUpdate(status=status_update, description=None)
 
         old_status = agent.status
@@ -656,29 +756,21 @@ class AgentService(LoggerMixin):
 
         # Update status and description
         agent.status = status_update.status
-        agent.status_updated_at = datetime.now()
-        agent.last_activity = datetime.now()
+        agent.status_updated_at = agent.last_activity = datetime.now()
 
         # Set description based on status if not provided
         if status_update.description:
             agent.status_description = status_update.description
         else:
             # Default descriptions based on status
-            default_descriptions = {
-                AgentStatusEnum.IDLE: "Agent is idle and ready for tasks",
-                AgentStatusEnum.RUNNING: "Agent is actively processing tasks",
-                AgentStatusEnum.PAUSED: "Agent is paused and not processing tasks",
-                AgentStatusEnum.ERROR: "Agent encountered an error",
-                AgentStatusEnum.COMPLETED: "Agent has completed all assigned tasks",
-            }
-            agent.status_description = default_descriptions.get(
+            agent.status_description = self._DEFAULT_STATUS_DESCRIPTIONS.get(
                 status_update.status, f"Agent status changed to {status_update.status.value}"
             )
 
         log_agent_event(
             agent_id,
             "status_updated",
-            {
+            lambda: {
                 "old_status": old_status.value,
                 "new_status": status_update.status.value,
                 "old_description": old_description,
@@ -687,7 +779,7 @@ class AgentService(LoggerMixin):
         )
 
         self.logger.info(
-            f"Updated agent {agent_id} status: {old_status} -> {status_update.status} | {agent.status_description}"
+            "Updated agent %s status: %s -> %s | %s", agent_id, old_status, status_update.status, agent.status_description
         )
         return self._agent_to_response(agent)
 
@@ -707,16 +799,31 @@ class AgentService(LoggerMixin):
 
         # Add task to agent
         agent.tasks.append(task)
+        agent.tasks_by_id.setdefault(task.id, task)
         agent.last_activity = datetime.now()
 
-        log_agent_event(agent_id, "task_assigned", {"task_id": task.id, "task_title": task.title})
+        log_agent_event(agent_id, "task_assigned", lambda: {"task_id": task.id, "task_title": task.title})
 
-        self.logger.info(f"Assigned task {task.id} to agent: {agent_id}")
+        self.logger.info("Assigned task %s to agent: %s", task.id, agent_id)
         return True
 
     @handle_service_error
-    async def delegate_task(self, from_agent_id: str, to_agent_id: str, task: Task) -> bool:
-        """Delegate a task from one agent to another connected agent."""
+    async def get_agent_task(self, agent_id: str, task_id: str) -> Optional[Task]:
+        """Get a task held by an agent, or None if the agent or task is unknown."""
+        agent = self._agents.get(agent_id)
+        if not agent:
+            return None
+        return agent.tasks_by_id.get(task_id)
+
+    @handle_service_error
+    async def delegate_task(
+        self, from_agent_id: str, to_agent_id: str, task: Task, expected_version: Optional[int] = None
+    ) -> bool:
+        """Delegate a task from one agent to another connected agent.
+
+        Pass ``expected_version`` (the ``task.version`` the caller read) to reject the delegation with
+        ``ConcurrentDelegationError`` if the task was reassigned in the meantime.
+        """
         from_agent = self._agents.get(from_agent_id)
         to_agent = self._agents.get(to_agent_id)
 
@@ -724,29 +831,35 @@ class AgentService(LoggerMixin):
             return False
 
         # Check if agents are connected
-        if to_agent_id not in self._agent_connections.get(from_agent_id, []):
+        connections = self._agent_connections.get(from_agent_id)
+        if not connections or to_agent_id not in connections:
             raise AgentConnectionError(from_agent_id, to_agent_id, "Agents must be connected to delegate tasks")
 
-        # Update task assignment
-        task.assigned_to = to_agent_id
+        # Update task assignment (compare-and-swap on the task version when the caller supplied one)
+        if not _cas_assign(task, expected_version, to_agent_id):
+            raise ConcurrentDelegationError(task.id, expected_version, task.version)
         task.status = "pending"
 
         # Add task to target agent
+        now = datetime.now()
         to_agent.tasks.append(task)
-        to_agent.last_activity = datetime.now()
+        to_agent.tasks_by_id.setdefault(task.id, task)
+        to_agent.last_activity = now
 
         # Update source agent activity
-        from_agent.last_activity = datetime.now()
+        from_agent.last_activity = now
 
         log_agent_event(
-            from_agent_id, "task_delegated", {"task_id": task.id, "task_title": task.title, "to_agent_id": to_agent_id}
+            from_agent_id, "task_delegated", lambda: {"task_id": task.id, "task_title": task.title, "to_agent_id": to_agent_id}
         )
 
         log_agent_event(
-            to_agent_id, "task_received", {"task_id": task.id, "task_title": task.title, "from_agent_id": from_agent_id}
+            to_agent_id,
+            "task_received",
+            lambda: {"task_id": task.id, "task_title": task.title, "from_agent_id": from_agent_id},
         )
 
-        self.logger.info(f"Delegated task {task.id} from agent {from_agent_id} to agent {to_agent_id}")
+        self.logger.info("Delegated task %s from agent %s to agent %s", task.id, from_agent_id, to_agent_id)
         return True
 
     @handle_service_error
@@ -763,34 +876,38 @@ class AgentService(LoggerMixin):
             raise AgentConnectionError(parent_agent_id, child_agent_id, "Target agent must be a child of the parent agent")
 
         # Create new task
+        now = datetime.now()
         task = Task(
-            id=str(uuid.uuid4()),
+            id=self._next_id(),
             title=task_data.title,
             description=task_data.description,
             status=task_data.status,
             priority=task_data.priority,
-            created_at=datetime.now(),
+            created_at=now,
             assigned_to=child_agent_id,
         )
 
         # Add task to child agent
         child_agent.tasks.append(task)
-        child_agent.last_activity = datetime.now()
+        child_agent.tasks_by_id.setdefault(task.id, task)
+        child_agent.last_activity = now
 
         # Update parent agent activity
-        parent_agent.last_activity = datetime.now()
+        parent_agent.last_activity = now
 
         log_agent_event(
             parent_agent_id,
             "child_task_spawned",
-            {"task_id": task.id, "task_title": task.title, "child_agent_id": child_agent_id},
+            lambda: {"task_id": task.id, "task_title": task.title, "child_agent_id": child_agent_id},
         )
 
         log_agent_event(
-            child_agent_id, "task_spawned", {"task_id": task.id, "task_title": task.title, "parent_agent_id": parent_agent_id}
+            child_agent_id,
+            "task_spawned",
+            lambda: {"task_id": task.id, "task_title": task.title, "parent_agent_id": parent_agent_id},
         )
 
-        self.logger.info(f"Spawned task {task.id} for child agent {child_agent_id} from parent {parent_agent_id}")
+        self.logger.info("Spawned task %s for child agent %s from parent %s", task.id, child_agent_id, parent_agent_id)
         return True
 
     @handle_service_error
@@ -801,51 +918,54 @@ class AgentService(LoggerMixin):
             return False
 
         # Find the task
-        task = None
-        for t in agent.tasks:
-            if t.id == task_id:
-                task = t
-                break
-
+        task = agent.tasks_by_id.get(task_id)
         if not task:
             return False
 
-        # Update task status
+        # Update task status; one timestamp covers the whole notification fan-out
         task.status = "completed"
-        agent.last_activity = datetime.now()
+        now = datetime.now()
+        agent.last_activity = now
 
         # Notify connected agents
-        connected_agent_ids = self._agent_connections.get(agent_id, [])
-        for connected_id in connected_agent_ids:
-            connected_agent = self._agents.get(connected_id)
-            if connected_agent:
-                connected_agent.last_activity = datetime.now()
-
-                log_agent_event(
-                    connected_id,
-                    "task_completion_notified",
-                    {"task_id": task_id, "task_title": task.title, "completing_agent_id": agent_id, "result": result},
-                )
+        connected_agent_ids = self._agent_connections.get(agent_id, _NO_CONNECTIONS)
+        notified = list(connected_agent_ids)
+        for connected_agent in connected_agent_ids.values():
+            connected_agent.last_activity = now
+
+        # One record for the whole fan-out instead of one per connected agent
+        log_agent_events(
+            notified,
+            "task_completion_notified",
+            lambda: {"task_id": task_id, "task_title": task.title, "completing_agent_id": agent_id, "result": result},
+        )
 
         # Notify parent agent if this is a child agent
         if agent.parent_agent_id:
             parent_agent = self._agents.get(agent.parent_agent_id)
             if parent_agent:
-                parent_agent.last_activity = datetime.now()
+                parent_agent.last_activity = now
 
                 log_agent_event(
                     agent.parent_agent_id,
                     "child_task_completed",
-                    {"task_id": task_id, "task_title": task.title, "child_agent_id": agent_id, "result": result},
+                    lambda: {"task_id": task_id, "task_title": task.title, "child_agent_id": agent_id, "result": result},
                 )
 
         log_agent_event(
             agent_id,
             "task_completed",
-            {"task_id": task_id, "task_title": task.title, "result": result, "notified_agents": len(connected_agent_ids)},
+            lambda: {
+                "task_id": task_id,
+                "task_title": task.title,
+                "result": result,
+                "notified_agents": len(connected_agent_ids),
+            },
         )
 
-        self.logger.info(f"Task {task_id} completed by agent {agent_id}, notified {len(connected_agent_ids)} connected agents")
+        self.logger.info(
+            "Task %s completed by agent %s, notified %s connected agents", task_id, agent_id, len(connected_agent_ids)
+        )
         return True
 
     @handle_service_error
@@ -858,38 +978,78 @@ class AgentService(LoggerMixin):
         # Update agent status
         old_status = agent.status
         agent.status = status
-        agent.last_activity = datetime.now()
+        now = datetime.now()
+        agent.last_activity = now
 
         # Broadcast to connected agents
-        connected_agent_ids = self._agent_connections.get(agent_id, [])
-        for connected_id in connected_agent_ids:
-            connected_agent = self._agents.get(connected_id)
-            if connected_agent:
-                connected_agent.last_activity = datetime.now()
-
-                log_agent_event(
-                    connected_id,
-                    "status_change_broadcast",
-                    {"broadcasting_agent_id": agent_id, "old_status": old_status, "new_status": status, "message": message},
-                )
+        connected_agent_ids = self._agent_connections.get(agent_id, _NO_CONNECTIONS)
+        notified = list(connected_agent_ids)
+        for connected_agent in connected_agent_ids.values():
+            connected_agent.last_activity = now
+
+        # One record for the whole fan-out instead of one per connected agent
+        log_agent_events(
+            notified,
+            "status_change_broadcast",
+            lambda: {"broadcasting_agent_id": agent_id, "old_status": old_status, "new_status": status, "message": message},
+        )
 
         log_agent_event(
             agent_id,
             "status_broadcasted",
-            {"old_status": old_status, "new_status": status, "message": message, "notified_agents": len(connected_agent_ids)},
+            lambda: {
+                "old_status": old_status,
+                "new_status": status,
+                "message": message,
+                "notified_agents": len(connected_agent_ids),
+            },
         )
 
         self.logger.info(
-            f"Agent {agent_id} status changed from {old_status} to {status}, broadcasted to {len(connected_agent_ids)} connected agents"
+            "Agent %s status changed from %s to %s, broadcasted to %s connected agents",
+            agent_id,
+            old_status,
+            status,
+            len(connected_agent_ids),
         )
         return True
 
     @handle_service_error
     async def get_workflow_agents(self, workflow_id: str) -> List[str]:
         """Get all agent IDs in a workflow."""
-        return self._workflow_agents.get(workflow_id, [])
+        return list(self._workflow_agents.get(workflow_id, ()))
+
+    def register_workflow(self, workflow_id: str) -> None:
+        """Record a workflow as existing so creates skip the workflow service lookup."""
+        self._known_workflow_ids.add(workflow_id)
+
+    def unregister_workflow(self, workflow_id: str) -> None:
+        """Forget a deleted workflow so later creates in it are rejected."""
+        self._known_workflow_ids.discard(workflow_id)
+        self._drop_workflow_index(workflow_id)
+
+    def _drop_workflow_index(self, workflow_id: str) -> None:
+        """Remove a workflow's agent set and creation-order list."""
+        self._workflow_agents.pop(workflow_id, None)
+        self._workflow_agents_ordered.pop(workflow_id, None)
 
     # Helper methods
+    @staticmethod
+    def _create_cache_key(workflow_id: str, agent_data: AgentCreate, idempotency_key: str) -> str:
+        """Build a content-addressed key for an idempotent create_agent request."""
+        payload = {"workflow_id": workflow_id, "idempotency_key": idempotency_key, "agent": agent_data.model_dump(mode="json")}
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    _UUID_BATCH_SIZE = 256
+
+    def _next_id(self) -> str:
+        """Return a random UUID4 string, drawing entropy in batches to avoid a syscall per ID."""
+        if not self._uuid_buf:
+            data = os.urandom(16 * self._UUID_BATCH_SIZE)
+            self._uuid_buf = [str(uuid.UUID(bytes=data[i : i + 16], version=4)) for i in range(0, len(data), 16)]
+        return self._uuid_buf.pop()
+
     def _validate_agent_data(self, agent_data: AgentCreate) -> None:
         """Validate agent data."""
         if not agent_data.name or not agent_data.name.strip():
@@ -905,15 +1065,12 @@ class AgentService(LoggerMixin):
             raise ValueError(f"Max child agents cannot exceed {self.settings.max_child_agents}")
 
     def _validate_llm_config(self, llm_config) -> None:
-        """Validate LLM configuration."""
+        """Validate LLM configuration.
+
+        Temperature and max_tokens bounds are enforced by the ``LLMConfig`` schema fields when it is parsed.
+        """
         if not llm_config.provider:
             raise ValueError("LLM provider is required")
 
         if not llm_config.model:
             raise ValueError("LLM model is required")
-
-        if llm_config.temperature < 0 or llm_config.temperature > 2:
-            raise ValueError("Temperature must be between 0 and 2")
-
-        if llm_config.max_tokens <= 0:
-            raise ValueError("Max tokens must be positive")
@@ -4,11 +4,17 @@ Provides unified interface for different LLM providers with planning and dynamic
 """
 
 import json
+import hashlib
 import logging
-from typing import Dict, Any, List, Optional, Union
-from dataclasses import dataclass
+import re
+from types import MappingProxyType
+from typing import Deque, Dict, Any, List, Mapping, Optional, Union
+from dataclasses import dataclass, field, replace
 from enum import Enum
+from functools import lru_cache
 import asyncio
+import time
+from collections import OrderedDict, defaultdict, deque
 from datetime import datetime
 
 # LLM Provider imports
@@ -33,6 +39,22 @@ try:
 except ImportError:
     GOOGLE_AVAILABLE = False
 
+# HTTP/2 support for the provider HTTP clients
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Token counting
+try:
+    import tiktoken
+
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
 # Caching
 try:
     import diskcache as dc
@@ -44,6 +66,39 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+_WORD_RE = re.compile(r"\S+")
+
+
+@lru_cache(maxsize=1)
+def _token_encoder():
+    """Load the shared BPE encoder once; None if tiktoken or its encoding data is unavailable"""
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:  # encoding data is fetched on first use and may be unreachable
+        logger.warning("tiktoken encoding unavailable, falling back to word counts: %s", e)
+        return None
+
+
+async def warm_token_encoder() -> None:
+    """Load the BPE encoder in a worker thread so its first-use download never blocks the event loop"""
+    await asyncio.to_thread(_token_encoder)
+
+
+def _count_tokens(text: str) -> int:
+    """Estimate tokens with a BPE encoder, or count words when none is available"""
+    encoder = _token_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text))
+    return sum(1 for _ in _WORD_RE.finditer(text))
+
+
+def _preview(text: str, limit: int) -> str:
+    """Truncate text for log output"""
+    return text[:limit] + "..." if len(text) > limit else text
+
+
 class LLMProvider(Enum):
     OPENAI = "openai"
     ANTHROPIC = "anthropic"
@@ -57,7 +112,70 @@ class InferenceType(Enum):
     DECISION_MAKING = "decision_making"
 
 
-@dataclass
+# System prompts for dynamic inference, keyed by inference type
+_SYSTEM_PROMPTS: Mapping[InferenceType, str] = MappingProxyType(
+    {
+        InferenceType.ERROR_RECOVERY: """You are an error recovery expert. Analyze the error situation and provide recovery strategies.
+            
+Return JSON with:
+{
+  "error_analysis": "What went wrong",
+  "recovery_strategies": [
+    {
+      "strategy": "retry_with_backoff",
+      "description": "Retry with exponential backoff",
+      "parameters": {"max_retries": 3, "backoff_factor": 2}
+    }
+  ],
+  "recommended_action": "immediate_action_to_take"
+}""",
+        InferenceType.DECISION_MAKING: """You are a decision-making expert. Analyze the situation and provide the best course of action.
+            
+Return JSON with:
+{
+  "situation_analysis": "Analysis of current situation",
+  "options": [
+    {
+      "option": "option_name",
+      "description": "What this option does",
+      "pros": ["advantage_1", "advantage_2"],
+      "cons": ["disadvantage_1", "disadvantage_2"],
+      "confidence": 0.85
+    }
+  ],
+  "recommendation": "recommended_option",
+  "reasoning": "Why this is the best choice"
+}""",
+        InferenceType.DYNAMIC: """You are a dynamic adaptation expert. Analyze the situation and provide adaptive responses.
+            
+Return JSON with:
+{
+  "adaptation_needed": true,
+  "changes_required": [
+    {
+      "type": "modify_step",
+      "step_id": "step_1",
+      "modifications": {"timeout": 600, "retry_count": 5}
+    }
+  ],
+  "reasoning": "Why these changes are needed"
+}""",
+    }
+)
+
+
+def _new_http_client(sdk) -> Any:
+    """Build a pooled HTTP client for a provider SDK, owned and closed by one LLMService
+
+    Built from the SDK's own DefaultAsyncHttpxClient so its transport package and default
+    timeouts/limits apply (SDKs may ship different httpx distributions). Returns None, letting
+    the SDK build its default client, on SDK versions that predate DefaultAsyncHttpxClient.
+    """
+    factory = getattr(sdk, "DefaultAsyncHttpxClient", None)
+    return factory(http2=HTTP2_AVAILABLE) if factory is not None else None
+
+
+@dataclass(slots=True)
 class LLMConfig:
     provider: LLMProvider
     model: str
@@ -68,16 +186,24 @@ class LLMConfig:
     cache_ttl: int = 3600  # 1 hour
 
 
-@dataclass
+@dataclass(slots=True)
 class LLMRequest:
     prompt: str
     inference_type: InferenceType
     context: Optional[Dict[str, Any]] = None
     system_prompt: Optional[str] = None
     response_format: Optional[str] = "json"  # json, text, structured
+    _encoded_context: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def encoded_context(self) -> str:
+        """Compact JSON context, computed on first access and reused by every provider path"""
+        if self._encoded_context is None:
+            self._encoded_context = json.dumps(self.context, separators=(",", ":"))
+        return self._encoded_context
 
 
-@dataclass
+@dataclass(slots=True)
 class LLMResponse:
     content: str
     provider: LLMProvider
@@ -92,24 +218,44 @@ class LLMResponse:
 class LLMService:
     """Unified LLM service supporting multiple providers with caching and cost tracking"""
 
+    _MEM_CACHE_MAX = 1024
+
     def __init__(self, config: LLMConfig):
         self.config = config
         self.provider = config.provider
         self.client = self._initialize_client()
         self.cache = self._initialize_cache() if config.enable_caching else None
+        # In-process LRU in front of the disk cache: cache_key -> (expires_at monotonic, response)
+        self._mem_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        # Disk cache writes are queued and flushed in batches by a background task
+        self._cache_write_queue: Optional[asyncio.Queue] = None
+        self._cache_writer: Optional[asyncio.Task] = None
+        # Per-service part of every cache key, hashed once instead of on each request
+        self._cache_key_prefix = hashlib.blake2b(
+            json.dumps(
+                {
+                    "provider": self.provider.value,
+                    "model": config.model,
+                    "temperature": config.temperature,
+                    "max_tokens": config.max_tokens,
+                },
+                sort_keys=True,
+            ).encode(),
+            digest_size=16,
+        ).digest()
         self.cost_tracker = CostTracker()
 
     def _initialize_client(self):
-        """Initialize the appropriate LLM client"""
+        """Initialize the appropriate async LLM client so requests don't block the event loop"""
         if self.provider == LLMProvider.OPENAI:
             if not OPENAI_AVAILABLE:
                 raise ImportError("OpenAI package not installed")
-            return openai.OpenAI(api_key=self.config.api_key)
+            return openai.AsyncOpenAI(api_key=self.config.api_key, http_client=_new_http_client(openai))
 
         elif self.provider == LLMProvider.ANTHROPIC:
             if not ANTHROPIC_AVAILABLE:
                 raise ImportError("Anthropic package not installed")
-            return anthropic.Anthropic(api_key=self.config.api_key)
+            return anthropic.AsyncAnthropic(api_key=self.config.api_key, http_client=_new_http_client(anthropic))
 
         elif self.provider == LLMProvider.GOOGLE:
             if not GOOGLE_AVAILABLE:
@@ -166,88 +312,97 @@ Return a JSON response with this structure:
 
     async def dynamic_inference(self, situation: str, context: Dict[str, Any], inference_type: InferenceType) -> LLMResponse:
         """Handle dynamic inference during execution"""
-
-        system_prompts = {
-            InferenceType.ERROR_RECOVERY: """You are an error recovery expert. Analyze the error situation and provide recovery strategies.
-            
-Return JSON with:
-{
-  "error_analysis": "What went wrong",
-  "recovery_strategies": [
-    {
-      "strategy": "retry_with_backoff",
-      "description": "Retry with exponential backoff",
-      "parameters": {"max_retries": 3, "backoff_factor": 2}
-    }
-  ],
-  "recommended_action": "immediate_action_to_take"
-}""",
-            InferenceType.DECISION_MAKING: """You are a decision-making expert. Analyze the situation and provide the best course of action.
-            
-Return JSON with:
-{
-  "situation_analysis": "Analysis of current situation",
-  "options": [
-    {
-      "option": "option_name",
-      "description": "What this option does",
-      "pros": ["advantage_1", "advantage_2"],
-      "cons": ["disadvantage_1", "disadvantage_2"],
-      "confidence": 0.85
-    }
-  ],
-  "recommendation": "recommended_option",
-  "reasoning": "Why this is the best choice"
-}""",
-            InferenceType.DYNAMIC: """You are a dynamic adaptation expert. Analyze the situation and provide adaptive responses.
-            
-Return JSON with:
-{
-  "adaptation_needed": true,
-  "changes_required": [
-    {
-      "type": "modify_step",
-      "step_id": "step_1",
-      "modifications": {"timeout": 600, "retry_count": 5}
-    }
-  ],
-  "reasoning": "Why these changes are needed"
-}""",
-        }
-
         llm_request = LLMRequest(
             prompt=situation,
             inference_type=inference_type,
             context=context,
-            system_prompt=system_prompts[inference_type],
+            system_prompt=_SYSTEM_PROMPTS[inference_type],
             response_format="json",
         )
 
         return await self._execute_request(llm_request)
 
+    async def batch_dynamic_inference(
+        self, situations: List[str], contexts: List[Dict[str, Any]], inference_type: InferenceType
+    ) -> List[Union[LLMResponse, Exception]]:
+        """Handle several dynamic inferences of one type with a single LLM call, one response per situation
+
+        Falls back to individual calls if the batched call fails or its reply doesn't contain exactly one result per
+        situation; a situation whose individual call fails gets its exception in place of a response.
+        """
+        if len(situations) == 1:
+            return await self._individual_inferences(situations, contexts, inference_type)
+
+        count = len(situations)
+        llm_request = LLMRequest(
+            prompt="\n".join(f"Situation {index}: {situation}" for index, situation in enumerate(situations)),
+            inference_type=inference_type,
+            context={"situations": [{"index": index, "context": context} for index, context in enumerate(contexts)]},
+            system_prompt=(
+                f"{_SYSTEM_PROMPTS[inference_type]}\n\nYou will receive {count} independent situations. "
+                f'Return JSON {{"results": [...]}} holding exactly {count} objects of the format above, '
+                "one per situation, in the same order."
+            ),
+            response_format="json",
+        )
+        try:
+            response = await self._execute_request(llm_request)
+        except Exception:
+            logger.warning("Batched %s call failed, retrying %d situations individually", inference_type.value, count)
+            return await self._individual_inferences(situations, contexts, inference_type)
+
+        try:
+            results = json.loads(response.content)["results"]
+        except (ValueError, TypeError, KeyError):
+            results = None
+        if not isinstance(results, list) or len(results) != count:
+            logger.warning("Batched %s reply did not match %d situations, retrying individually", inference_type.value, count)
+            return await self._individual_inferences(situations, contexts, inference_type)
+
+        # Usage was recorded once for the whole batch; split it evenly across the per-situation responses
+        return [
+            replace(
+                response,
+                content=json.dumps(result),
+                tokens_used=response.tokens_used // count,
+                cost_estimate=response.cost_estimate / count,
+            )
+            for result in results
+        ]
+
+    async def _individual_inferences(
+        self, situations: List[str], contexts: List[Dict[str, Any]], inference_type: InferenceType
+    ) -> List[Union[LLMResponse, Exception]]:
+        """One dynamic inference call per situation; a failed call yields its exception in that situation's slot"""
+        calls = (self.dynamic_inference(*pair, inference_type) for pair in zip(situations, contexts))
+        return list(await asyncio.gather(*calls, return_exceptions=True))
+
     async def _execute_request(self, request: LLMRequest) -> LLMResponse:
         """Execute LLM request with caching and error handling"""
 
-        # Log the request details
-        logger.debug(f"🚀 LLM REQUEST - Provider: {self.provider.value}, Model: {self.config.model}")
-        logger.debug(f"📝 PROMPT: {request.prompt[:200]}{'...' if len(request.prompt) > 200 else ''}")
-        if request.system_prompt:
-            logger.debug(f"🎯 SYSTEM: {request.system_prompt[:100]}{'...' if len(request.system_prompt) > 100 else ''}")
-        if request.context:
-            logger.debug(f"📋 CONTEXT: {str(request.context)[:200]}{'...' if len(str(request.context)) > 200 else ''}")
+        # Log the request details (previews are only built when DEBUG is enabled)
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("LLM REQUEST - Provider: %s, Model: %s", self.provider.value, self.config.model)
+            logger.debug("LLM PROMPT: %s", _preview(request.prompt, 200))
+            if request.system_prompt:
+                logger.debug("LLM SYSTEM: %s", _preview(request.system_prompt, 100))
+            if request.context:
+                logger.debug("LLM CONTEXT: %s", _preview(json.dumps(request.context, indent=2, default=str), 200))
 
         # Check cache first
-        if self.cache:
+        cache_key = None
+        if self.config.enable_caching:
             cache_key = self._generate_cache_key(request)
-            cached_response = self.cache.get(cache_key)
+            cached_response = self._cache_get(cache_key)
             if cached_response:
-                logger.info(f"💾 Cache hit for {request.inference_type}")
-                cached_response.cached = True
-                return cached_response
+                logger.info("Cache hit for %s", request.inference_type)
+                return replace(cached_response, cached=True)
 
         # Execute request based on provider
         try:
-            logger.debug(f"🌐 Sending request to {self.provider.value}...")
+            if debug:
+                logger.debug("Sending request to %s...", self.provider.value)
             if self.provider == LLMProvider.OPENAI:
                 response = await self._execute_openai_request(request)
             elif self.provider == LLMProvider.ANTHROPIC:
@@ -258,24 +413,23 @@ Return JSON with:
                 raise ValueError(f"Unsupported provider: {self.provider}")
 
             # Log the response
-            logger.debug(f"✅ LLM RESPONSE: {response.content[:300]}{'...' if len(response.content) > 300 else ''}")
-            logger.debug(
-                f"📊 TOKENS: Input={response.input_tokens}, Output={response.output_tokens}, Cost=${response.cost:.4f}"
-            )
+            if debug:
+                logger.debug("LLM RESPONSE: %s", _preview(response.content, 300))
+                logger.debug("LLM TOKENS: Total=%s, Cost=$%.4f", response.tokens_used, response.cost_estimate)
 
             # Cache the response
-            if self.cache:
-                self.cache.set(cache_key, response, expire=self.config.cache_ttl)
-                logger.debug(f"💾 Response cached with key: {cache_key[:50]}...")
+            if cache_key:
+                self._cache_set(cache_key, response)
+                logger.debug("Response cached with key: %s...", cache_key[:50])
 
             # Track costs
             self.cost_tracker.add_usage(response)
-            logger.info(f"💰 Total session cost: ${self.cost_tracker.total_cost:.4f}")
+            logger.info("Total session cost: $%.4f", self.cost_tracker.total_cost)
 
             return response
 
         except Exception as e:
-            logger.error(f"❌ LLM request failed: {str(e)}")
+            logger.error("LLM request failed: %s", e)
             raise
 
     async def _execute_openai_request(self, request: LLMRequest) -> LLMResponse:
@@ -288,7 +442,7 @@ Return JSON with:
             if request.system_prompt:
                 user_content += f"Instructions: {request.system_prompt}\n\n"
             if request.context:
-                user_content += f"Context: {json.dumps(request.context, indent=2)}\n\n"
+                user_content += f"Context: {request.encoded_context}\n\n"
             user_content += request.prompt
             messages.append({"role": "user", "content": user_content})
         else:
@@ -297,18 +451,18 @@ Return JSON with:
                 messages.append({"role": "system", "content": request.system_prompt})
 
             if request.context:
-                context_str = f"Context: {json.dumps(request.context, indent=2)}\n\n"
+                context_str = f"Context: {request.encoded_context}\n\n"
                 messages.append({"role": "user", "content": context_str + request.prompt})
             else:
                 messages.append({"role": "user", "content": request.prompt})
 
         # o1 models use different parameter names and don't support temperature
         if self.config.model.startswith("o1"):
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=self.config.model, messages=messages, max_completion_tokens=self.config.max_tokens
             )
         else:
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=self.config.model,
                 messages=messages,
                 temperature=self.config.temperature,
@@ -329,7 +483,7 @@ Return JSON with:
         """Execute Anthropic request"""
         prompt = request.prompt
         if request.context:
-            prompt = f"Context: {json.dumps(request.context, indent=2)}\n\n{prompt}"
+            prompt = f"Context: {request.encoded_context}\n\n{prompt}"
 
         response = await self.client.messages.create(
             model=self.config.model,
@@ -353,7 +507,7 @@ Return JSON with:
         """Execute Google request"""
         prompt = request.prompt
         if request.context:
-            prompt = f"Context: {json.dumps(request.context, indent=2)}\n\n{prompt}"
+            prompt = f"Context: {request.encoded_context}\n\n{prompt}"
 
         if request.system_prompt:
             prompt = f"{request.system_prompt}\n\n{prompt}"
@@ -367,7 +521,7 @@ Return JSON with:
         )
 
         # Google doesn't provide token usage in the same way
-        estimated_tokens = len(prompt.split()) + len(response.text.split())
+        estimated_tokens = _count_tokens(prompt) + _count_tokens(response.text)
 
         return LLMResponse(
             content=response.text,
@@ -380,16 +534,88 @@ Return JSON with:
         )
 
     def _generate_cache_key(self, request: LLMRequest) -> str:
-        """Generate cache key for request"""
-        key_data = {
-            "provider": self.provider.value,
-            "model": self.config.model,
-            "prompt": request.prompt,
-            "system_prompt": request.system_prompt,
-            "context": request.context,
-            "temperature": self.config.temperature,
-        }
-        return f"llm_cache:{hash(json.dumps(key_data, sort_keys=True))}"
+        """Generate cache key for request (stable across processes, unlike hash())
+
+        Only the per-request fields are hashed here, each length-prefixed so adjacent fields can't collide.
+        """
+        h = hashlib.blake2b(self._cache_key_prefix, digest_size=16)
+        for part in (request.prompt, request.system_prompt):
+            if part is None:
+                h.update(b"\xff")
+            else:
+                data = part.encode()
+                h.update(len(data).to_bytes(8, "little"))
+                h.update(data)
+        if request.context is not None:
+            h.update(json.dumps(request.context, sort_keys=True, separators=(",", ":"), default=str).encode())
+        return "llm_cache:" + h.hexdigest()
+
+    def _cache_get(self, cache_key: str) -> Optional[LLMResponse]:
+        """Look up a cached response in memory first, then on disk"""
+        entry = self._mem_cache.get(cache_key)
+        if entry:
+            expires_at, response = entry
+            if expires_at > time.monotonic():
+                self._mem_cache.move_to_end(cache_key)
+                return response
+            del self._mem_cache[cache_key]
+
+        response = self.cache.get(cache_key) if self.cache else None
+        if response:
+            self._mem_cache_put(cache_key, response)
+        return response
+
+    def _cache_set(self, cache_key: str, response: LLMResponse) -> None:
+        """Store a response in memory now and queue the disk cache write"""
+        self._mem_cache_put(cache_key, response)
+        if not self.cache:
+            return
+        writer = self._cache_writer
+        if writer is None or writer.done() or writer.get_loop() is not asyncio.get_running_loop():
+            self._cache_write_queue = asyncio.Queue()
+            self._cache_writer = asyncio.create_task(self._drain_cache_writes(self._cache_write_queue))
+        self._cache_write_queue.put_nowait((cache_key, response, self.config.cache_ttl))
+
+    async def _drain_cache_writes(self, queue: asyncio.Queue) -> None:
+        """Background task: write queued responses to disk, batching whatever has accumulated"""
+        while True:
+            items = [await queue.get()]
+            while not queue.empty():
+                items.append(queue.get_nowait())
+            try:
+                await asyncio.to_thread(self._write_cache_batch, items)
+            except Exception as e:
+                logger.error("Failed to write %s responses to the LLM cache: %s", len(items), e)
+            finally:
+                for _ in items:
+                    queue.task_done()
+
+    def _write_cache_batch(self, items: List[tuple]) -> None:
+        """Write a batch of (key, response, ttl) entries in a single disk cache transaction"""
+        with self.cache.transact():
+            for cache_key, response, ttl in items:
+                self.cache.set(cache_key, response, expire=ttl)
+
+    async def flush_cache_writes(self) -> None:
+        """Wait for queued disk cache writes to finish"""
+        if self._cache_write_queue is not None and self._cache_writer and not self._cache_writer.done():
+            await self._cache_write_queue.join()
+
+    async def close(self) -> None:
+        """Flush pending cache writes, stop the background writer and close the provider HTTP client"""
+        await self.flush_cache_writes()
+        if self._cache_writer is not None:
+            self._cache_writer.cancel()
+            self._cache_writer = None
+        if self.provider in (LLMProvider.OPENAI, LLMProvider.ANTHROPIC):
+            await self.client.close()
+
+    def _mem_cache_put(self, cache_key: str, response: LLMResponse) -> None:
+        """Insert into the in-memory LRU, evicting the least recently used entry when full"""
+        self._mem_cache[cache_key] = (time.monotonic() + self.config.cache_ttl, response)
+        self._mem_cache.move_to_end(cache_key)
+        if len(self._mem_cache) > self._MEM_CACHE_MAX:
+            self._mem_cache.popitem(last=False)
 
     def _calculate_cost(self, tokens: int) -> float:
         """Calculate estimated cost based on tokens and provider"""
@@ -408,59 +634,64 @@ Return JSON with:
 
 
 class CostTracker:
-    """Track LLM usage and costs"""
+    """Track LLM usage and costs
+
+    Only the most recent ``capacity`` usage records are retained, in a bounded deque of plain
+    tuples (about a third of the memory of one dict per record); ``usage_log`` builds the dicts.
+    Aggregate stats are maintained incrementally and cover every record ever added.
+    """
 
-    def __init__(self):
-        self.usage_log = []
+    _CAPACITY = 65536
+    _FIELDS = ("timestamp", "provider", "model", "tokens", "cost", "inference_type", "cached")
+
+    def __init__(self, capacity: int = _CAPACITY):
         self.total_cost = 0.0
         self.total_tokens = 0
+        self._records: Deque[tuple] = deque(maxlen=capacity)
+        self._count = 0  # records ever added, including those dropped from the deque
+        self._cached_count = 0
+        self._type_counts: Dict[str, int] = defaultdict(int)
+        self._provider_costs: Dict[str, float] = defaultdict(float)
 
     def add_usage(self, response: LLMResponse):
         """Add usage record"""
-        self.usage_log.append(
-            {
-                "timestamp": response.timestamp,
-                "provider": response.provider.value,
-                "model": response.model,
-                "tokens": response.tokens_used,
-                "cost": response.cost_estimate,
-                "inference_type": response.inference_type.value,
-                "cached": response.cached,
-            }
+        self._records.append(
+            (
+                response.timestamp,
+                response.provider.value,
+                response.model,
+                response.tokens_used,
+                response.cost_estimate,
+                response.inference_type.value,
+                response.cached,
+            )
         )
+        self._count += 1
 
+        self._cached_count += response.cached
+        self._type_counts[response.inference_type.value] += 1
         if not response.cached:
             self.total_cost += response.cost_estimate
             self.total_tokens += response.tokens_used
+            self._provider_costs[response.provider.value] += response.cost_estimate
+
+    @property
+    def usage_log(self) -> List[Dict[str, Any]]:
+        """Retained usage records, oldest first, materialized as dicts"""
+        fields = self._FIELDS
+        return [dict(zip(fields, record)) for record in self._records]
 
     def get_stats(self) -> Dict[str, Any]:
         """Get usage statistics"""
         return {
-            "total_requests": len(self.usage_log),
+            "total_requests": self._count,
             "total_cost": self.total_cost,
             "total_tokens": self.total_tokens,
-            "cache_hit_rate": len([r for r in self.usage_log if r["cached"]]) / len(self.usage_log) if self.usage_log else 0,
-            "requests_by_type": self._group_by_inference_type(),
-            "cost_by_provider": self._group_by_provider(),
+            "cache_hit_rate": self._cached_count / self._count if self._count else 0,
+            "requests_by_type": dict(self._type_counts),
+            "cost_by_provider": dict(self._provider_costs),
         }
 
-    def _group_by_inference_type(self) -> Dict[str, int]:
-        """Group usage by inference type"""
-        groups = {}
-        for record in self.usage_log:
-            inference_type = record["inference_type"]
-            groups[inference_type] = groups.get(inference_type, 0) + 1
-        return groups
-
-    def _group_by_provider(self) -> Dict[str, float]:
-        """Group cost by provider"""
-        groups = {}
-        for record in self.usage_log:
-            if not record["cached"]:
-                provider = record["provider"]
-                groups[provider] = groups.get(provider, 0.0) + record["cost"]
-        return groups
-
 
 class LLMServiceFactory:
     """Factory for creating LLM services"""
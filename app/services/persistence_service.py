@@ -52,6 +52,9 @@ class PersistenceService:
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
 
+            # WAL lets readers proceed while agent/task writes are in flight
+            cursor.execute("PRAGMA journal_mode=WAL")
+
             # Task executions table
             cursor.execute(
                 """
@@ -131,39 +134,38 @@ class PersistenceService:
             conn.commit()
             logger.info("Database initialized successfully")
 
+    _SAVE_TASK_EXECUTION_SQL = """
+        INSERT OR REPLACE INTO task_executions
+        (task_id, agent_id, workflow_id, status, start_time, end_time,
+         result, error, retries, max_retries, intelligence_level,
+         llm_interactions, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    """
+
+    @staticmethod
+    def _task_execution_row(execution: TaskExecution) -> tuple:
+        """Build the task_executions row parameters for an execution"""
+        return (
+            execution.task_id,
+            execution.agent_id,
+            execution.workflow_id,
+            execution.status.value,
+            execution.started_at.isoformat() if execution.started_at else None,
+            execution.completed_at.isoformat() if execution.completed_at else None,
+            json.dumps(execution.result) if execution.result else None,
+            execution.error,
+            execution.retries,
+            3,  # max_retries - not in new model
+            execution.intelligence_level.value,
+            json.dumps(execution.llm_interactions, default=str),  # already capped by record_llm_interaction
+        )
+
     async def save_task_execution(self, execution: TaskExecution) -> bool:
         """Save or update task execution"""
         try:
             with sqlite3.connect(self.db_path) as conn:
                 cursor = conn.cursor()
-
-                # Convert complex data to JSON
-                llm_interactions_json = json.dumps([])
-                result_json = json.dumps(execution.result) if execution.result else None
-
-                cursor.execute(
-                    """
-                    INSERT OR REPLACE INTO task_executions 
-                    (task_id, agent_id, workflow_id, status, start_time, end_time, 
-                     result, error, retries, max_retries, intelligence_level, 
-                     llm_interactions, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                """,
-                    (
-                        execution.task_id,
-                        execution.agent_id,
-                        execution.workflow_id,
-                        execution.status.value,
-                        execution.started_at.isoformat() if execution.started_at else None,
-                        execution.completed_at.isoformat() if execution.completed_at else None,
-                        result_json,
-                        execution.error,
-                        0,  # retries - not in new model
-                        3,  # max_retries - not in new model
-                        execution.intelligence_level.value,
-                        llm_interactions_json,
-                    ),
-                )
+                cursor.execute(self._SAVE_TASK_EXECUTION_SQL, self._task_execution_row(execution))
 
                 conn.commit()
                 logger.debug(f"Saved task execution: {execution.task_id}")
@@ -173,6 +175,24 @@ class PersistenceService:
             logger.error(f"Failed to save task execution {execution.task_id}: {e}")
             return False
 
+    async def save_task_executions_batch(self, executions: List[TaskExecution]) -> bool:
+        """Save or update several task executions in one transaction"""
+        if not executions:
+            return True
+
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.executemany(self._SAVE_TASK_EXECUTION_SQL, [self._task_execution_row(e) for e in executions])
+
+                conn.commit()
+                logger.debug(f"Saved {len(executions)} task executions")
+                return True
+
+        except Exception as e:
+            logger.error(f"Failed to save {len(executions)} task executions: {e}")
+            return False
+
     async def load_task_execution(self, task_id: str) -> Optional[TaskExecution]:
         """Load task execution by ID"""
         try:
@@ -208,6 +228,7 @@ class PersistenceService:
                     error=row[6],
                     started_at=datetime.fromisoformat(row[3]),
                     completed_at=datetime.fromisoformat(row[4]) if row[4] else None,
+                    llm_interactions=llm_interactions,
                 )
 
         except Exception as e:
@@ -295,8 +316,8 @@ class PersistenceService:
                     """
                     INSERT OR REPLACE INTO agent_states 
                     (agent_id, workflow_id, name, agent_type, status, 
-                     capabilities, config, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                     capabilities, config, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
                 """,
                     (
                         agent.id,
@@ -306,6 +327,7 @@ class PersistenceService:
                         agent.status.value,
                         capabilities_json,
                         config_json,
+                        agent.created_at.isoformat(),
                     ),
                 )
 
@@ -3,22 +3,70 @@ Task Service for Hybrid Intelligence Architecture
 Handles task lifecycle management, LLM-powered planning, and dynamic execution
 """
 
+import hashlib
 import json
 import logging
 import asyncio
-from typing import Dict, Any, List, Optional, Set
+import copy
+import time
+from typing import Awaitable, Callable, Dict, Any, FrozenSet, List, Optional, Set, Tuple, Union
 from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime, timedelta
 import uuid
+from pydantic import BaseModel, Field, ValidationError, field_validator
+from collections import Counter, OrderedDict, defaultdict, deque
 
 from ..models.schemas import Task, TaskCreate, TaskUpdate, Agent, TaskStatus, IntelligenceLevel, TaskExecution, WorkflowPlan
-from .llm_service import LLMService, LLMServiceFactory, InferenceType
+from .llm_service import LLMResponse, LLMService, LLMServiceFactory, InferenceType
 from .agent_service import AgentService
 from .persistence_service import PersistenceService, PersistenceConfig
+from ..utils.config import get_settings
+
+# Faster JSON decoding for LLM recovery replies
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+    _json_loads = orjson.loads
+except ImportError:
+    ORJSON_AVAILABLE = False
+    _json_loads = json.loads
 
 logger = logging.getLogger(__name__)
 
+# Enum value strings, looked up once instead of via .value on every status poll
+_STATUS_STR: Dict[TaskStatus, str] = {status: status.value for status in TaskStatus}
+_LEVEL_STR: Dict[IntelligenceLevel, str] = {level: level.value for level in IntelligenceLevel}
+
+# Intelligence levels allowed to ask the LLM for error recovery
+_LLM_ENABLED_LEVELS = frozenset({IntelligenceLevel.ADAPTIVE, IntelligenceLevel.INTELLIGENT, IntelligenceLevel.AUTONOMOUS})
+
+# Shared dependency set for steps without dependencies (the common case for first steps)
+_NO_DEPENDENCIES: FrozenSet[str] = frozenset()
+
+# Recovery strategies whose parameters don't depend on the failing step, so replies made of them can be cached
+_STEP_AGNOSTIC_STRATEGIES = frozenset({"retry_with_backoff"})
+
+
+class _PlanPayload(BaseModel):
+    """Expected shape of an LLM planning reply; unknown keys are ignored"""
+
+    workflow_id: Optional[str] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    steps: List[Dict[str, Any]] = Field(default_factory=list)
+    success_criteria: Any = ""
+    failure_handling: Any = ""
+
+    @field_validator("workflow_id", "title", "description", mode="before")
+    @classmethod
+    def _numbers_to_str(cls, value: Any) -> Any:
+        """Accept numeric ids and titles, which LLMs sometimes emit unquoted"""
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+        return value
+
 
 class TaskPriority(Enum):
     LOW = "low"
@@ -27,9 +75,166 @@ class TaskPriority(Enum):
     CRITICAL = "critical"
 
 
+class _BoundedLRU(OrderedDict):
+    """OrderedDict capped at ``max_size`` entries; reads and writes mark an entry most recently used"""
+
+    def __init__(self, max_size: int):
+        super().__init__()
+        self.max_size = max_size
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.max_size:
+            self._evict_oldest()
+
+    def _evictable(self, value) -> bool:
+        return True
+
+    def _evict_oldest(self):
+        for key, value in self.items():
+            if self._evictable(value):
+                del self[key]
+                return
+
+
+class _ExecutionStore(_BoundedLRU):
+    """task_id -> TaskExecution LRU that keeps a running count of executions per status
+
+    Only finished executions are evicted, either when the store is over capacity or, swept at most once per
+    ``sweep_interval`` seconds on insert, once they finished more than ``retention_seconds`` ago.
+    """
+
+    _ACTIVE = frozenset({TaskStatus.PENDING, TaskStatus.RUNNING})
+
+    def __init__(self, max_size: int = 10000, retention_seconds: float = 3600, sweep_interval: float = 60):
+        super().__init__(max_size)
+        self.status_counts: Counter = Counter()
+        self.retention = timedelta(seconds=retention_seconds)
+        self.sweep_interval = sweep_interval
+        self._last_sweep = time.monotonic()
+
+    def __setitem__(self, task_id: str, execution: TaskExecution):
+        previous = self.get(task_id)
+        if previous is not None:
+            self.status_counts[previous.status] -= 1
+        self.status_counts[execution.status] += 1
+        super().__setitem__(task_id, execution)
+        if time.monotonic() - self._last_sweep >= self.sweep_interval:
+            self.evict_expired()
+
+    def __delitem__(self, task_id: str):
+        self.status_counts[self.get(task_id).status] -= 1
+        super().__delitem__(task_id)
+
+    def pop(self, task_id: str, *default):
+        if task_id in self:
+            self.status_counts[self.get(task_id).status] -= 1
+        return super().pop(task_id, *default)
+
+    def clear(self):
+        super().clear()
+        self.status_counts.clear()
+
+    def _evictable(self, execution: TaskExecution) -> bool:
+        return execution.status not in self._ACTIVE
+
+    def evict_expired(self) -> int:
+        """Drop finished executions that completed before the retention window; returns how many"""
+        self._last_sweep = time.monotonic()
+        cutoff = datetime.now() - self.retention
+        expired = [
+            task_id
+            for task_id, execution in self.items()
+            if self._evictable(execution) and (execution.completed_at or execution.created_at) < cutoff
+        ]
+        for task_id in expired:
+            del self[task_id]
+        return len(expired)
+
+    def set_status(self, execution: TaskExecution, status: TaskStatus):
+        """Move an execution to a new status, keeping the counts in step if it is stored here"""
+        if self.get(execution.task_id) is execution:
+            self.status_counts[execution.status] -= 1
+            self.status_counts[status] += 1
+            self.move_to_end(execution.task_id)
+        execution.status = status
+
+
+class _RecoveryBatcher:
+    """Coalesces error-recovery prompts raised within a short window into one batched LLM call
+
+    A batch is sent when the window closes or as soon as ``max_batch`` prompts are waiting, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[List[str], List[Dict[str, Any]]], Awaitable[List[Union[LLMResponse, Exception]]]],
+        window: float = 0.02,
+        max_batch: int = 16,
+    ):
+        self._flush = flush
+        self.window = window
+        self.max_batch = max_batch
+        self.pending: List[Tuple[str, Dict[str, Any], asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._sending: Set[asyncio.Task] = set()
+
+    async def submit(self, situation: str, context: Dict[str, Any]) -> LLMResponse:
+        """Queue a recovery prompt and wait for its slice of the batched response"""
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((situation, context, future))
+        if len(self.pending) >= self.max_batch:
+            # Full batch: send now instead of waiting out the window
+            if self._flush_task is not None:
+                self._flush_task.cancel()
+                self._flush_task = None
+            task = asyncio.create_task(self._send(self._take_batch()))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+        elif self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_after_window())
+        return await future
+
+    def _take_batch(self) -> List[Tuple[str, Dict[str, Any], asyncio.Future]]:
+        batch, self.pending = self.pending, []
+        return batch
+
+    async def _flush_after_window(self):
+        await asyncio.sleep(self.window)
+        self._flush_task = None
+        await self._send(self._take_batch())
+
+    async def _send(self, batch: List[Tuple[str, Dict[str, Any], asyncio.Future]]):
+        try:
+            responses = await self._flush([situation for situation, _, _ in batch], [context for _, context, _ in batch])
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        # Each prompt fails or succeeds on its own; one failed call doesn't fail the rest of the batch
+        for (_, _, future), response in zip(batch, responses):
+            if future.done():
+                continue
+            if isinstance(response, BaseException):
+                future.set_exception(response)
+            else:
+                future.set_result(response)
+
+
 class TaskService:
     """Enhanced task service with LLM integration and intelligent execution"""
 
+    _RECOVERY_CACHE_MAX = 512
+    _RECOVERY_CACHE_TTL = 600  # seconds; strategies older than this are asked for again
+
     def __init__(
         self,
         agent_service: AgentService,
@@ -39,10 +244,24 @@ class TaskService:
         self.agent_service = agent_service
         self.llm_service = llm_service or self._initialize_llm_service()
         self.persistence_service = persistence_service or PersistenceService()
-        self.task_executions: Dict[str, TaskExecution] = {}
-        self.workflow_plans: Dict[str, WorkflowPlan] = {}
-        self.task_dependencies: Dict[str, Set[str]] = {}
+        settings = get_settings()
+        # Bounded in memory; evicted entries stay in storage and are reloaded on the next lookup
+        self.task_executions: _ExecutionStore = _ExecutionStore(
+            settings.max_task_executions, retention_seconds=settings.task_retention_seconds
+        )
+        self.workflow_plans: Dict[str, WorkflowPlan] = _BoundedLRU(settings.max_workflow_plans)
+        # workflow_id -> (step index and dependency version the order was computed from, ordered steps, cyclic steps)
+        self._execution_orders: Dict[str, tuple] = _BoundedLRU(settings.max_workflow_plans)
+        self.task_dependencies: Dict[str, FrozenSet[str]] = {}  # read-only sets; replaced, never mutated
+        self._dependencies_version = 0  # bumped whenever task_dependencies is written
         self.running_tasks: Set[str] = set()
+        self._recovery_batcher = _RecoveryBatcher(self._batch_recovery_inference)
+        self._planning_inflight: Dict[str, asyncio.Future] = {}
+        self._recovery_cache: "OrderedDict[Tuple[Any, ...], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        # Write-behind persistence: latest state per task, flushed in batches by one background task
+        self._persist_pending: Dict[str, TaskExecution] = {}
+        self._persist_worker_task: Optional[asyncio.Task] = None
+        self._persist_window = 0.02
         self._data_loaded = False
 
     async def _ensure_data_loaded(self):
@@ -56,7 +275,7 @@ class TaskService:
         try:
             return LLMServiceFactory.create_from_env()
         except Exception as e:
-            logger.warning(f"Could not initialize LLM service: {e}")
+            logger.warning("Could not initialize LLM service: %s", e)
             return None
 
     async def _load_persisted_data(self):
@@ -73,76 +292,136 @@ class TaskService:
             for task in pending_tasks:
                 self.task_executions[task.task_id] = task
 
-            logger.info(f"Loaded {len(running_tasks)} running tasks and {len(pending_tasks)} pending tasks from persistence")
+            logger.info(
+                "Loaded %s running tasks and %s pending tasks from persistence", len(running_tasks), len(pending_tasks)
+            )
 
         except Exception as e:
-            logger.error(f"Failed to load persisted data: {e}")
+            logger.error("Failed to load persisted data: %s", e)
 
     async def _persist_task_execution(self, execution: TaskExecution):
-        """Persist task execution to storage"""
+        """Queue a task execution for the next batched write; repeated updates to one task collapse to its latest state"""
+        self._persist_pending[execution.task_id] = execution
+        if self._persist_worker_task is None:
+            self._persist_worker_task = asyncio.create_task(self._persist_worker())
+
+    async def _persist_worker(self):
+        """Flush queued task executions every persist window until the queue stays empty"""
+        try:
+            while self._persist_pending:
+                await asyncio.sleep(self._persist_window)
+                await self._flush_persist()
+        finally:
+            self._persist_worker_task = None
+
+    async def _flush_persist(self):
+        """Write all queued task executions now, in one batch"""
+        if not self._persist_pending:
+            return
+
+        batch = list(self._persist_pending.values())
+        self._persist_pending.clear()
         try:
-            await self.persistence_service.save_task_execution(execution)
+            await self.persistence_service.save_task_executions_batch(batch)
         except Exception as e:
-            logger.error(f"Failed to persist task execution {execution.task_id}: {e}")
+            logger.error("Failed to persist %s task executions: %s", len(batch), e)
+
+    async def _get_workflow_plan(self, workflow_id: str) -> Optional[WorkflowPlan]:
+        """Look up a workflow plan, reloading it from storage if it was evicted from memory"""
+        if workflow_id in self.workflow_plans:
+            return self.workflow_plans[workflow_id]
+
+        plan = await self.persistence_service.load_workflow_plan(workflow_id)
+        if plan is not None:
+            self.workflow_plans[workflow_id] = plan
+            self._create_task_dependencies(plan.steps)
+        return plan
+
+    async def _get_task_execution(self, task_id: str) -> Optional[TaskExecution]:
+        """Look up a task execution, reloading it from storage if it was evicted from memory"""
+        if task_id in self.task_executions:
+            return self.task_executions[task_id]
+
+        execution = await self.persistence_service.load_task_execution(task_id)
+        if execution is not None:
+            self.task_executions[task_id] = execution
+        return execution
+
+    async def close(self) -> None:
+        """Write any task executions still queued for persistence"""
+        await self._flush_persist()
 
     async def _persist_workflow_plan(self, plan: WorkflowPlan):
         """Persist workflow plan to storage"""
         try:
             await self.persistence_service.save_workflow_plan(plan)
         except Exception as e:
-            logger.error(f"Failed to persist workflow plan {plan.workflow_id}: {e}")
+            logger.error("Failed to persist workflow plan %s: %s", plan.workflow_id, e)
 
     # Planning Phase Methods
 
     async def create_workflow_from_request(self, request: str, context: Optional[Dict[str, Any]] = None) -> WorkflowPlan:
-        """Create structured workflow plan from complex request using LLM"""
+        """Create structured workflow plan from complex request using LLM
+
+        Identical concurrent requests (same request text and context) share one in-flight LLM planning call.
+        """
         await self._ensure_data_loaded()
 
         if not self.llm_service:
             raise ValueError("LLM service not available for planning")
 
-        logger.info(f"Creating workflow plan for request: {request[:100]}...")
+        key = hashlib.blake2b(
+            json.dumps([request, context], sort_keys=True, separators=(",", ":"), default=str).encode(), digest_size=16
+        ).hexdigest()
+        planning = self._planning_inflight.get(key)
+        if planning is None:
+            planning = asyncio.ensure_future(self._plan_workflow(request, context))
+            self._planning_inflight[key] = planning
+            planning.add_done_callback(lambda _: self._planning_inflight.pop(key, None))
+
+        # Shielded so one caller giving up doesn't cancel the plan the others are waiting on
+        return await asyncio.shield(planning)
+
+    async def _plan_workflow(self, request: str, context: Optional[Dict[str, Any]]) -> WorkflowPlan:
+        """Ask the LLM for a workflow plan, then store, persist and index it"""
+        logger.info("Creating workflow plan for request: %s...", request[:100])
 
         # Generate workflow plan using LLM
         llm_response = await self.llm_service.generate_planning_workflow(request, context)
 
         try:
-            plan_data = json.loads(llm_response.content)
-
-            workflow_plan = WorkflowPlan(
-                workflow_id=plan_data.get("workflow_id", str(uuid.uuid4())),
-                title=plan_data.get("title", "Generated Workflow"),
-                description=plan_data.get("description", ""),
-                steps=plan_data.get("steps", []),
-                metadata={
-                    "success_criteria": plan_data.get("success_criteria", ""),
-                    "failure_handling": plan_data.get("failure_handling", ""),
-                    "estimated_duration": self._estimate_duration(plan_data.get("steps", [])),
-                },
-            )
+            # Parse and validate in one pass (pydantic-core) instead of json.loads plus per-field .get() calls
+            plan_data = _PlanPayload.model_validate_json(llm_response.content)
+        except ValidationError as e:
+            logger.error("Failed to parse LLM response: %s", e)
+            raise ValueError(f"Invalid workflow plan format: {e}")
 
-            # Store and persist the workflow plan
-            self.workflow_plans[workflow_plan.workflow_id] = workflow_plan
-            await self._persist_workflow_plan(workflow_plan)
+        workflow_plan = WorkflowPlan(
+            workflow_id=plan_data.workflow_id or str(uuid.uuid4()),
+            title=plan_data.title or "Generated Workflow",
+            description=plan_data.description or "",
+            steps=plan_data.steps,
+            metadata={
+                "success_criteria": plan_data.success_criteria,
+                "failure_handling": plan_data.failure_handling,
+                "estimated_duration": self._estimate_duration(plan_data.steps),
+            },
+        )
 
-            # Create task dependencies from steps
-            self._create_task_dependencies(workflow_plan.steps)
+        # Store and persist the workflow plan
+        self.workflow_plans[workflow_plan.workflow_id] = workflow_plan
+        await self._persist_workflow_plan(workflow_plan)
 
-            logger.info(f"Created workflow plan {workflow_plan.workflow_id} with {len(workflow_plan.steps)} steps")
+        # Create task dependencies from steps
+        self._create_task_dependencies(workflow_plan.steps)
 
-            return workflow_plan
+        logger.info("Created workflow plan %s with %s steps", workflow_plan.workflow_id, len(workflow_plan.steps))
 
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse LLM response: {e}")
-            raise ValueError(f"Invalid workflow plan format: {e}")
+        return workflow_plan
 
     def _estimate_duration(self, steps: List[Dict[str, Any]]) -> int:
         """Estimate workflow duration based on steps"""
-        total_duration = 0
-        for step in steps:
-            step_timeout = step.get("timeout", 300)  # Default 5 minutes
-            total_duration += step_timeout
-        return total_duration
+        return sum(step.get("timeout", 300) for step in steps)  # Default 5 minutes per step
 
     def _create_task_dependencies(self, steps: List[Dict[str, Any]]):
         """Create task dependencies from workflow steps"""
@@ -151,7 +430,8 @@ class TaskService:
             dependencies = step.get("dependencies", [])
 
             if step_id:
-                self.task_dependencies[step_id] = set(dependencies)
+                self.task_dependencies[step_id] = frozenset(dependencies) if dependencies else _NO_DEPENDENCIES
+        self._dependencies_version += 1
 
     # Task Execution Methods
 
@@ -161,132 +441,191 @@ class TaskService:
         """Execute a workflow plan with specified intelligence level"""
         await self._ensure_data_loaded()
 
-        if workflow_id not in self.workflow_plans:
+        workflow_plan = await self._get_workflow_plan(workflow_id)
+        if workflow_plan is None:
             raise ValueError(f"Workflow {workflow_id} not found")
-
-        workflow_plan = self.workflow_plans[workflow_id]
-        logger.info(f"Executing workflow {workflow_id} with intelligence level {intelligence_level.value}")
+        logger.info("Executing workflow %s with intelligence level %s", workflow_id, intelligence_level.value)
+        started = time.monotonic()
 
         # Create agents for each step
         step_agents = await self._create_agents_for_workflow(workflow_plan, intelligence_level)
 
-        # Execute steps in dependency order
+        # Steps run concurrently as soon as their dependencies complete; each step signals its event when done
         execution_results = {}
+        ordered_steps, cyclic_steps = self._plan_execution_order(workflow_plan)
+        step_events = {step["step_id"]: asyncio.Event() for step in ordered_steps}
+        halted = False
+        completed_steps = 0  # counted as results are recorded, so the final status needs no rescan
 
-        for step in self._get_execution_order(workflow_plan.steps):
+        async def run_step(step: Dict[str, Any]) -> None:
+            nonlocal halted, completed_steps
             step_id = step["step_id"]
-
             try:
-                # Wait for dependencies to complete
-                await self._wait_for_dependencies(step_id, execution_results)
+                try:
+                    # Wait for dependencies to complete
+                    await self._wait_for_dependencies(step_id, execution_results, step_events)
+                except Exception:
+                    return  # A dependency failed, so the workflow is halting; leave this step unexecuted
+                if halted:
+                    return
 
-                # Execute the step
-                result = await self._execute_step(step, step_agents[step_id], intelligence_level)
-                execution_results[step_id] = result
+                try:
+                    # Execute the step
+                    result = await self._execute_step(step, step_agents[step_id], intelligence_level, workflow_id)
+                    logger.info("Step %s completed successfully", step_id)
 
-                logger.info(f"Step {step_id} completed successfully")
+                except Exception as e:
+                    logger.error("Step %s failed: %s", step_id, e)
+                    result = None
 
-            except Exception as e:
-                logger.error(f"Step {step_id} failed: {e}")
-
-                # Handle failure with intelligence
-                if intelligence_level in [
-                    IntelligenceLevel.ADAPTIVE,
-                    IntelligenceLevel.INTELLIGENT,
-                    IntelligenceLevel.AUTONOMOUS,
-                ]:
-                    recovery_result = await self._handle_step_failure(step, e, intelligence_level)
-                    if recovery_result:
-                        execution_results[step_id] = recovery_result
-                        continue
-
-                # If recovery failed or not available, fail the workflow
-                execution_results[step_id] = {"status": "failed", "error": str(e)}
+                    # Handle failure with intelligence
+                    if intelligence_level in _LLM_ENABLED_LEVELS:
+                        result = await self._handle_step_failure(
+                            step, e, intelligence_level, step_agents[step_id], workflow_id
+                        )
+
+                    # If recovery failed or not available, fail the workflow
+                    if not result:
+                        result = {"status": "failed", "error": str(e)}
+                        halted = True
+
+                execution_results[step_id] = result
+                if result.get("status") == "completed":
+                    completed_steps += 1
+            finally:
+                event = step_events.get(step_id)
+                if event:
+                    event.set()
+
+        for outcome in await asyncio.gather(*(run_step(step) for step in ordered_steps), return_exceptions=True):
+            if isinstance(outcome, BaseException):
+                raise outcome
+
+        # Steps caught in a dependency cycle can't be scheduled by their events; run them one by one
+        for step in cyclic_steps:
+            if halted:
                 break
+            await run_step(step)
 
+        await self._flush_persist()
+        completed_at = datetime.now().isoformat()
         return {
             "workflow_id": workflow_id,
-            "status": "completed" if all(r.get("status") == "completed" for r in execution_results.values()) else "failed",
+            "status": "completed" if completed_steps == len(execution_results) else "failed",
             "results": execution_results,
-            "execution_time": datetime.now().isoformat(),
+            "execution_time": completed_at,
+            "completed_at": completed_at,
+            "duration_s": time.monotonic() - started,
         }
 
     async def _create_agents_for_workflow(
         self, workflow_plan: WorkflowPlan, intelligence_level: IntelligenceLevel
     ) -> Dict[str, str]:
-        """Create agents for workflow execution"""
-        step_agents = {}
+        """Create agents for workflow execution, one concurrent batch for all steps"""
+        step_ids = []
+        creations = []
 
         for step in workflow_plan.steps:
-            step_id = step["step_id"]
+            step_ids.append(step["step_id"])
             agent_type = step.get("agent_type", "general_agent")
 
             # Create agent with appropriate configuration
             agent_config = {
                 "agent_type": agent_type,
-                "intelligence_level": intelligence_level.value,
+                "intelligence_level": _LEVEL_STR[intelligence_level],
                 "step_context": step,
-                "llm_enabled": intelligence_level != IntelligenceLevel.BASIC,
+                "llm_enabled": intelligence_level is not IntelligenceLevel.BASIC,
             }
 
             # Create agent through agent service
-            agent_id = await self.agent_service.create_agent(workflow_id=workflow_plan.workflow_id, config=agent_config)
+            creations.append(self.agent_service.create_agent(workflow_id=workflow_plan.workflow_id, config=agent_config))
 
-            step_agents[step_id] = agent_id
-            logger.info(f"Created agent {agent_id} for step {step_id}")
+        step_agents = dict(zip(step_ids, await asyncio.gather(*creations)))
+        for step_id, agent_id in step_agents.items():
+            logger.info("Created agent %s for step %s", agent_id, step_id)
 
         return step_agents
 
+    def _plan_execution_order(self, workflow_plan: WorkflowPlan) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Dependency order for a plan, sorted once and reused by later runs until its steps or dependencies change"""
+        by_id = workflow_plan.steps_by_id  # a new index object whenever the steps list is replaced or grows
+        # task_dependencies is shared across plans by step_id, so a later plan reusing ids can rewrite them
+        version = self._dependencies_version
+        cached = self._execution_orders.get(workflow_plan.workflow_id)
+        if cached is not None and cached[0] is by_id and cached[1] == version:
+            return cached[2], cached[3]
+
+        ordered_steps, cyclic_steps = self._topological_sort(workflow_plan.steps, by_id)
+        self._execution_orders[workflow_plan.workflow_id] = (by_id, version, ordered_steps, cyclic_steps)
+        return ordered_steps, cyclic_steps
+
     def _get_execution_order(self, steps: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Get steps in dependency execution order"""
-        # Simple topological sort
+        ordered_steps, cyclic_steps = self._topological_sort(steps)
+        return ordered_steps + cyclic_steps
+
+    def _topological_sort(
+        self, steps: List[Dict[str, Any]], by_id: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Split steps into dependency order (Kahn's algorithm) and the leftover steps caught in a cycle
+
+        Pass ``by_id`` (e.g. ``WorkflowPlan.steps_by_id``) to reuse an existing step index.
+        """
+        if by_id is None:
+            by_id = {step["step_id"]: step for step in steps}
+        indegree: Dict[str, int] = {}
+        dependents: Dict[str, List[str]] = defaultdict(list)
+
+        for step_id in by_id:
+            # Dependencies outside this step list can never be scheduled here, so they don't block
+            known = [dep for dep in self.task_dependencies.get(step_id, _NO_DEPENDENCIES) if dep in by_id]
+            indegree[step_id] = len(known)
+            for dep in known:
+                dependents[dep].append(step_id)
+
+        ready = deque(step_id for step_id, degree in indegree.items() if degree == 0)
         ordered_steps = []
-        remaining_steps = steps.copy()
 
-        while remaining_steps:
-            # Find steps with no unresolved dependencies
-            ready_steps = []
-            for step in remaining_steps:
-                step_id = step["step_id"]
-                dependencies = self.task_dependencies.get(step_id, set())
-
-                # Check if all dependencies are already executed
-                if all(
-                    dep_step["step_id"] in [s["step_id"] for s in ordered_steps]
-                    for dep_step in steps
-                    if dep_step["step_id"] in dependencies
-                ):
-                    ready_steps.append(step)
-
-            if not ready_steps:
-                # Circular dependency or other issue
-                logger.warning("Circular dependency detected, executing remaining steps in order")
-                ordered_steps.extend(remaining_steps)
-                break
+        while ready:
+            step_id = ready.popleft()
+            ordered_steps.append(by_id[step_id])
+            for dependent in dependents.get(step_id, ()):
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    ready.append(dependent)
 
-            # Add ready steps to execution order
-            for step in ready_steps:
-                ordered_steps.append(step)
-                remaining_steps.remove(step)
+        cyclic_steps = []
+        if len(ordered_steps) < len(by_id):
+            # Circular dependency or other issue
+            logger.warning("Circular dependency detected, executing remaining steps in order")
+            cyclic_steps = [by_id[step_id] for step_id, degree in indegree.items() if degree > 0]
 
-        return ordered_steps
+        return ordered_steps, cyclic_steps
 
-    async def _wait_for_dependencies(self, step_id: str, execution_results: Dict[str, Any]):
-        """Wait for step dependencies to complete"""
-        dependencies = self.task_dependencies.get(step_id, set())
+    async def _wait_for_dependencies(
+        self, step_id: str, execution_results: Dict[str, Any], step_events: Dict[str, asyncio.Event]
+    ):
+        """Wait for step dependencies to complete, woken by each dependency's completion event"""
+        dependencies = [dep_id for dep_id in self.task_dependencies.get(step_id, _NO_DEPENDENCIES) if dep_id in step_events]
+        if dependencies:
+            await asyncio.gather(*(step_events[dep_id].wait() for dep_id in dependencies))
 
         for dep_id in dependencies:
-            while dep_id not in execution_results:
-                await asyncio.sleep(0.1)  # Wait for dependency to complete
-
             # Check if dependency succeeded
             if execution_results[dep_id].get("status") != "completed":
                 raise Exception(f"Dependency {dep_id} failed")
 
     async def _execute_step(
-        self, step: Dict[str, Any], agent_id: str, intelligence_level: IntelligenceLevel
+        self, step: Dict[str, Any], agent_id: str, intelligence_level: IntelligenceLevel, workflow_id: str
     ) -> Dict[str, Any]:
         """Execute a single workflow step"""
+        execution = await self._begin_execution(step, agent_id, intelligence_level, workflow_id)
+        return await self._run_execution(execution, step)
+
+    async def _begin_execution(
+        self, step: Dict[str, Any], agent_id: str, intelligence_level: IntelligenceLevel, workflow_id: str
+    ) -> TaskExecution:
+        """Create, register and persist the execution record for a step"""
         step_id = step["step_id"]
 
         # Create task execution record
@@ -303,29 +642,27 @@ class TaskService:
         self.task_executions[step_id] = execution
         self.running_tasks.add(step_id)
         await self._persist_task_execution(execution)
+        return execution
+
+    async def _run_execution(self, execution: TaskExecution, step: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a step's agent action, recording the outcome on its existing execution record"""
+        step_id = execution.task_id
+        started = time.monotonic()  # durations from the monotonic clock, immune to wall-clock adjustments
 
         try:
             # Execute the step based on agent type
-            result = await self._execute_agent_action(step, agent_id, intelligence_level)
+            result = await self._execute_agent_action(step, execution.agent_id, execution.intelligence_level)
 
             # Update execution record
-            execution.status = TaskStatus.COMPLETED
+            self.task_executions.set_status(execution, TaskStatus.COMPLETED)
             execution.completed_at = datetime.now()
             execution.result = result
             await self._persist_task_execution(execution)
 
-            return {
-                "status": "completed",
-                "result": result,
-                "execution_time": (
-                    (execution.completed_at - execution.started_at).total_seconds()
-                    if execution.completed_at and execution.started_at
-                    else 0
-                ),
-            }
+            return {"status": "completed", "result": result, "execution_time": time.monotonic() - started}
 
         except Exception as e:
-            execution.status = TaskStatus.FAILED
+            self.task_executions.set_status(execution, TaskStatus.FAILED)
             execution.completed_at = datetime.now()
             execution.error = str(e)
             await self._persist_task_execution(execution)
@@ -334,6 +671,26 @@ class TaskService:
         finally:
             self.running_tasks.discard(step_id)
 
+    async def _retry_execution(self, step: Dict[str, Any], agent_id: str, workflow_id: str) -> Dict[str, Any]:
+        """Re-run a failed step on its existing execution record (same agent, BASIC intelligence)
+
+        The record is recreated if the bounded execution store has already evicted it.
+        """
+        execution = self.task_executions.get(step["step_id"])
+        if execution is None or execution.agent_id != agent_id:
+            execution = await self._begin_execution(step, agent_id, IntelligenceLevel.BASIC, workflow_id)
+        else:
+            execution.intelligence_level = IntelligenceLevel.BASIC
+            execution.task_data = step
+            execution.started_at = datetime.now()
+            execution.completed_at = None
+            execution.error = None
+            self.task_executions.set_status(execution, TaskStatus.RUNNING)
+            self.running_tasks.add(execution.task_id)
+
+        execution.retries += 1
+        return await self._run_execution(execution, step)
+
     async def _execute_agent_action(
         self, step: Dict[str, Any], agent_id: str, intelligence_level: IntelligenceLevel
     ) -> Dict[str, Any]:
@@ -349,61 +706,111 @@ class TaskService:
                 "action": action,
                 "inputs": inputs,
                 "step_context": step,
-                "intelligence_level": intelligence_level.value,
+                "intelligence_level": _LEVEL_STR[intelligence_level],
             },
         )
 
         return result
 
     async def _handle_step_failure(
-        self, step: Dict[str, Any], error: Exception, intelligence_level: IntelligenceLevel
+        self, step: Dict[str, Any], error: Exception, intelligence_level: IntelligenceLevel, agent_id: str, workflow_id: str
     ) -> Optional[Dict[str, Any]]:
         """Handle step failure with LLM assistance"""
         if not self.llm_service:
             return None
 
         step_id = step["step_id"]
-        logger.info(f"Attempting intelligent recovery for step {step_id}")
-
-        # Prepare context for LLM
-        context = {
-            "step": step,
-            "error": str(error),
-            "intelligence_level": intelligence_level.value,
-            "execution_history": self.task_executions.get(step_id, {}).__dict__ if step_id in self.task_executions else {},
-        }
+        logger.info("Attempting intelligent recovery for step %s", step_id)
+
+        execution = self.task_executions.get(step_id)
+        # Repeated failures of the same kind of step reuse the strategy the LLM gave last time
+        cache_key = (step.get("agent_type"), step.get("action"), type(error).__name__)
+        recovery_data = self._cached_recovery(cache_key)
+        cached = recovery_data is not None
+
+        if not cached:
+            # Prepare context for LLM
+            context = {
+                "step": step,
+                "error": str(error),
+                "intelligence_level": _LEVEL_STR[intelligence_level],
+                "execution_history": execution.snapshot_for_llm() if execution else {},
+            }
 
-        # Get recovery strategy from LLM
-        recovery_response = await self.llm_service.dynamic_inference(
-            situation=f"Step '{step_id}' failed with error: {error}",
-            context=context,
-            inference_type=InferenceType.ERROR_RECOVERY,
-        )
+            # Get recovery strategy from LLM; steps failing together share one batched call
+            recovery_response = await self._recovery_batcher.submit(f"Step '{step_id}' failed with error: {error}", context)
 
         try:
-            recovery_data = json.loads(recovery_response.content)
-
-            # Log LLM interaction
-            if step_id in self.task_executions:
-                self.task_executions[step_id].llm_interactions.append(
-                    {"type": "error_recovery", "timestamp": datetime.now().isoformat(), "response": recovery_data}
+            if not cached:
+                recovery_data = _json_loads(recovery_response.content)
+                if isinstance(recovery_data, dict) and self._is_step_agnostic(recovery_data):
+                    self._cache_recovery(cache_key, recovery_data)
+
+            # Log LLM interaction; a reused strategy is marked cached since no LLM call was made for it
+            if execution:
+                execution.record_llm_interaction(
+                    {
+                        "type": "error_recovery",
+                        "timestamp": datetime.now().isoformat(),
+                        "response": recovery_data,
+                        "cached": cached,
+                    }
                 )
 
             # Implement recovery strategies
             for strategy in recovery_data.get("recovery_strategies", []):
                 if strategy["strategy"] == "retry_with_backoff":
                     # Implement retry logic
-                    return await self._retry_step_with_backoff(step, strategy["parameters"])
+                    return await self._retry_step_with_backoff(step, strategy["parameters"], agent_id, workflow_id)
                 elif strategy["strategy"] == "modify_and_retry":
                     # Modify step parameters and retry
-                    return await self._modify_and_retry_step(step, strategy["parameters"])
+                    return await self._modify_and_retry_step(step, strategy["parameters"], agent_id, workflow_id)
 
         except (json.JSONDecodeError, Exception) as e:
-            logger.error(f"Failed to process recovery response: {e}")
+            logger.error("Failed to process recovery response: %s", e)
 
         return None
 
-    async def _retry_step_with_backoff(self, step: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _is_step_agnostic(recovery_data: Dict[str, Any]) -> bool:
+        """True if a recovery reply can be reused for other steps
+
+        Replies without strategies are not reused (they would block recovery for every similar step), nor are
+        modify_and_retry strategies, which carry step-specific overrides.
+        """
+        strategies = recovery_data.get("recovery_strategies")
+        return isinstance(strategies, list) and bool(strategies) and all(
+            isinstance(strategy, dict) and strategy.get("strategy") in _STEP_AGNOSTIC_STRATEGIES for strategy in strategies
+        )
+
+    def _cached_recovery(self, cache_key: Tuple[Any, ...]) -> Optional[Dict[str, Any]]:
+        """Return a copy of a still-fresh cached recovery reply, or None"""
+        entry = self._recovery_cache.get(cache_key)
+        if entry is None:
+            return None
+        expires_at, recovery_data = entry
+        if expires_at <= time.monotonic():
+            del self._recovery_cache[cache_key]
+            return None
+        self._recovery_cache.move_to_end(cache_key)
+        return copy.deepcopy(recovery_data)
+
+    def _cache_recovery(self, cache_key: Tuple[Any, ...], recovery_data: Dict[str, Any]) -> None:
+        """Remember a recovery reply, evicting the least recently used entry when full"""
+        self._recovery_cache[cache_key] = (time.monotonic() + self._RECOVERY_CACHE_TTL, copy.deepcopy(recovery_data))
+        self._recovery_cache.move_to_end(cache_key)
+        if len(self._recovery_cache) > self._RECOVERY_CACHE_MAX:
+            self._recovery_cache.popitem(last=False)
+
+    async def _batch_recovery_inference(
+        self, situations: List[str], contexts: List[Dict[str, Any]]
+    ) -> List[Union[LLMResponse, Exception]]:
+        """Ask the LLM for recovery strategies for a batch of failed steps"""
+        return await self.llm_service.batch_dynamic_inference(situations, contexts, InferenceType.ERROR_RECOVERY)
+
+    async def _retry_step_with_backoff(
+        self, step: Dict[str, Any], params: Dict[str, Any], agent_id: str, workflow_id: str
+    ) -> Dict[str, Any]:
         """Retry step with exponential backoff"""
         max_retries = params.get("max_retries", 3)
         backoff_factor = params.get("backoff_factor", 2)
@@ -411,28 +818,29 @@ class TaskService:
         for attempt in range(max_retries):
             try:
                 await asyncio.sleep(backoff_factor**attempt)
-                return await self._execute_step(step, step["agent_id"], IntelligenceLevel.BASIC)
+                return await self._retry_execution(step, agent_id, workflow_id)
             except Exception as e:
                 if attempt == max_retries - 1:
                     raise e
                 continue
 
-    async def _modify_and_retry_step(self, step: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+    async def _modify_and_retry_step(
+        self, step: Dict[str, Any], params: Dict[str, Any], agent_id: str, workflow_id: str
+    ) -> Dict[str, Any]:
         """Modify step parameters and retry"""
-        # Apply modifications
-        modified_step = step.copy()
-        for key, value in params.items():
-            if key in modified_step:
-                modified_step[key] = value
+        # Apply modifications to known keys only; the step is shared by reference when nothing changes
+        overrides = {key: value for key, value in params.items() if key in step}
+        modified_step = {**step, **overrides} if overrides else step
 
-        return await self._execute_step(modified_step, step["agent_id"], IntelligenceLevel.BASIC)
+        return await self._retry_execution(modified_step, agent_id, workflow_id)
 
     # Task Management Methods
 
     async def get_task_status(self, task_id: str) -> Dict[str, Any]:
         """Get detailed task status"""
         await self._ensure_data_loaded()
-        if task_id not in self.task_executions:
+        execution = await self._get_task_execution(task_id)
+        if execution is None:
             return {
                 "task_id": task_id,
                 "status": "not_found",
@@ -444,17 +852,15 @@ class TaskService:
                 "intelligence_level": None,
             }
 
-        execution = self.task_executions[task_id]
-
         return {
             "task_id": task_id,
-            "status": execution.status.value,
+            "status": _STATUS_STR[execution.status],
             "agent_id": execution.agent_id,
-            "start_time": execution.started_at.isoformat() if execution.started_at else None,
-            "end_time": execution.completed_at.isoformat() if execution.completed_at else None,
+            "start_time": execution.isoformat("started_at"),
+            "end_time": execution.isoformat("completed_at"),
             "result": execution.result,
             "error": execution.error,
-            "intelligence_level": execution.intelligence_level.value,
+            "intelligence_level": _LEVEL_STR[execution.intelligence_level],
         }
 
     async def cancel_task(self, task_id: str) -> bool:
@@ -465,9 +871,10 @@ class TaskService:
 
             if task_id in self.task_executions:
                 execution = self.task_executions[task_id]
-                execution.status = TaskStatus.CANCELLED
+                self.task_executions.set_status(execution, TaskStatus.CANCELLED)
                 execution.completed_at = datetime.now()
                 await self._persist_task_execution(execution)
+                await self._flush_persist()
 
             return True
 
@@ -477,20 +884,20 @@ class TaskService:
         """Get workflow execution status"""
         await self._ensure_data_loaded()
 
-        if workflow_id not in self.workflow_plans:
+        workflow_plan = await self._get_workflow_plan(workflow_id)
+        if workflow_plan is None:
             return {"status": "not_found"}
 
-        workflow_plan = self.workflow_plans[workflow_id]
         step_statuses = {}
 
         for step in workflow_plan.steps:
             step_id = step["step_id"]
-            if step_id in self.task_executions:
-                execution = self.task_executions[step_id]
+            execution = await self._get_task_execution(step_id)
+            if execution is not None:
                 step_statuses[step_id] = {
-                    "status": execution.status.value,
-                    "start_time": execution.started_at.isoformat() if execution.started_at else None,
-                    "end_time": execution.completed_at.isoformat() if execution.completed_at else None,
+                    "status": _STATUS_STR[execution.status],
+                    "start_time": execution.isoformat("started_at"),
+                    "end_time": execution.isoformat("completed_at"),
                 }
             else:
                 step_statuses[step_id] = {"status": "pending"}
@@ -505,19 +912,26 @@ class TaskService:
         }
 
     def _calculate_workflow_status(self, step_statuses: Dict[str, Dict[str, Any]]) -> str:
-        """Calculate overall workflow status"""
-        statuses = [step["status"] for step in step_statuses.values()]
-
-        if any(status == "failed" for status in statuses):
-            return "failed"
-        elif any(status == "cancelled" for status in statuses):
+        """Calculate overall workflow status in one pass (failed > cancelled > running > completed > pending)"""
+        cancelled = running = False
+        all_completed = True
+
+        for step in step_statuses.values():
+            status = step["status"]
+            if status == "failed":
+                return "failed"
+            if status == "cancelled":
+                cancelled = True
+            elif status == "running":
+                running = True
+            elif status != "completed":
+                all_completed = False
+
+        if cancelled:
             return "cancelled"
-        elif any(status == "running" for status in statuses):
+        if running:
             return "running"
-        elif all(status == "completed" for status in statuses):
-            return "completed"
-        else:
-            return "pending"
+        return "completed" if all_completed else "pending"
 
     def get_llm_usage_stats(self) -> Dict[str, Any]:
         """Get LLM usage statistics"""
@@ -534,8 +948,8 @@ class TaskService:
             "total_workflows": len(self.workflow_plans),
             "total_executions": len(self.task_executions),
             "running_tasks": len(self.running_tasks),
-            "completed_tasks": len([e for e in self.task_executions.values() if e.status == TaskStatus.COMPLETED]),
-            "failed_tasks": len([e for e in self.task_executions.values() if e.status == TaskStatus.FAILED]),
+            "completed_tasks": self.task_executions.status_counts[TaskStatus.COMPLETED],
+            "failed_tasks": self.task_executions.status_counts[TaskStatus.FAILED],
             "llm_usage": self.get_llm_usage_stats(),
         }
 
@@ -545,11 +959,10 @@ class TaskService:
         """Add a dynamically created step to an executing workflow."""
         await self._ensure_data_loaded()
 
-        if workflow_id not in self.workflow_plans:
+        workflow_plan = await self._get_workflow_plan(workflow_id)
+        if workflow_plan is None:
             raise ValueError(f"Workflow {workflow_id} not found")
 
-        workflow_plan = self.workflow_plans[workflow_id]
-
         # Convert dynamic step to regular step format
         step_dict = {
             "step_id": dynamic_step["step_id"],
@@ -569,115 +982,133 @@ class TaskService:
         workflow_plan.steps.append(step_dict)
 
         # Update task dependencies
-        self.task_dependencies[dynamic_step["step_id"]] = set(dynamic_step["dependencies"])
+        dependencies = dynamic_step["dependencies"]
+        self.task_dependencies[dynamic_step["step_id"]] = frozenset(dependencies) if dependencies else _NO_DEPENDENCIES
+        self._dependencies_version += 1
 
         # Persist the updated workflow plan
         await self._persist_workflow_plan(workflow_plan)
 
-        logger.info(f"Added dynamic step {dynamic_step['step_id']} to workflow {workflow_id}")
+        logger.info("Added dynamic step %s to workflow %s", dynamic_step["step_id"], workflow_id)
 
     async def execute_workflow_with_delegation(
         self, workflow_id: str, intelligence_level: IntelligenceLevel = IntelligenceLevel.BASIC
     ) -> Dict[str, Any]:
-        """Enhanced workflow execution that supports dynamic task delegation."""
+        """Enhanced workflow execution that supports dynamic task delegation.
+
+        Steps are scheduled by indegree: each one starts as soon as its last dependency completes, and steps
+        appended by ``add_dynamic_step`` while the workflow runs are picked up after every completion.
+        """
 
         await self._ensure_data_loaded()
 
-        if workflow_id not in self.workflow_plans:
+        workflow_plan = await self._get_workflow_plan(workflow_id)
+        if workflow_plan is None:
             raise ValueError(f"Workflow {workflow_id} not found")
-
-        workflow_plan = self.workflow_plans[workflow_id]
-        logger.info(f"Executing workflow {workflow_id} with delegation support")
+        logger.info("Executing workflow %s with delegation support", workflow_id)
+        started = time.monotonic()
 
         # Create initial agents for workflow steps
         step_agents = await self._create_agents_for_workflow(workflow_plan, intelligence_level)
 
         execution_results = {}
-        executed_steps = set()
-
-        # Execute steps with dynamic delegation support
-        max_iterations = 100  # Prevent infinite loops
-        iteration = 0
-
-        while iteration < max_iterations:
-            iteration += 1
-
-            # Get next executable steps (including dynamically added ones)
-            executable_steps = self._get_next_executable_steps(workflow_plan.steps, executed_steps, execution_results)
-
-            if not executable_steps:
-                break  # No more steps to execute
-
-            for step in executable_steps:
+        successful_steps = 0
+        indegree: Dict[str, int] = {}  # dependencies each waiting step still needs to complete
+        dependents: Dict[str, List[str]] = defaultdict(list)
+        waiting: Dict[str, Dict[str, Any]] = {}
+        scheduled: Set[str] = set()
+        admitted = 0  # steps are only ever appended, so new ones start at this index
+        launched = 0
+
+        async def run(step: Dict[str, Any]) -> None:
+            nonlocal successful_steps
+            step_id = step["step_id"]
+            result = await self._run_one(step, step_agents, intelligence_level, workflow_id)
+            execution_results[step_id] = result
+
+            if result["status"] == "completed":
+                successful_steps += 1
+                for dependent in dependents.pop(step_id, ()):
+                    indegree[dependent] -= 1
+                    if indegree[dependent] == 0:
+                        del indegree[dependent]
+                        launch(waiting.pop(dependent))
+
+            # Pick up steps delegated while this one was running
+            admit_new_steps()
+
+        def launch(step: Dict[str, Any]) -> None:
+            nonlocal launched
+            launched += 1
+            task_group.create_task(run(step))
+
+        def admit_new_steps() -> None:
+            nonlocal admitted
+            steps = workflow_plan.steps
+            while admitted < len(steps):
+                step = steps[admitted]
+                admitted += 1
                 step_id = step["step_id"]
+                if step_id in scheduled:
+                    continue  # duplicate step id
+                scheduled.add(step_id)
 
-                try:
-                    # Determine which agent to use
-                    if "target_agent_id" in step:
-                        # This is a delegated step
-                        executing_agent_id = step["target_agent_id"]
-                    else:
-                        # Regular step
-                        executing_agent_id = step_agents.get(step_id)
-
-                    if not executing_agent_id:
-                        raise ValueError(f"No agent available for step {step_id}")
-
-                    # Execute the step with delegation support
-                    result = await self._execute_step_with_delegation(
-                        step, executing_agent_id, intelligence_level, workflow_id
-                    )
-
-                    execution_results[step_id] = result
-                    executed_steps.add(step_id)
+                # Steps whose dependencies fail or never appear simply stay waiting
+                blocked = {
+                    dep for dep in step.get("dependencies", []) if execution_results.get(dep, {}).get("status") != "completed"
+                }
+                if blocked:
+                    indegree[step_id] = len(blocked)
+                    waiting[step_id] = step
+                    for dep in blocked:
+                        dependents[dep].append(step_id)
+                else:
+                    launch(step)
 
-                    logger.info(f"Step {step_id} completed successfully")
+        # The group owns every step task: it waits for steps launched mid-run and cancels the rest if one is cancelled
+        async with asyncio.TaskGroup() as task_group:
+            admit_new_steps()
 
-                except Exception as e:
-                    logger.error(f"Step {step_id} failed: {e}")
-                    execution_results[step_id] = {"status": "failed", "error": str(e)}
-                    executed_steps.add(step_id)
+        await self._flush_persist()
 
         # Calculate final status
-        successful_steps = len([r for r in execution_results.values() if r.get("status") == "completed"])
         total_steps = len(execution_results)
 
+        completed_at = datetime.now().isoformat()
         return {
             "workflow_id": workflow_id,
             "status": "completed" if successful_steps == total_steps else "completed_with_errors",
             "results": execution_results,
-            "execution_time": datetime.now().isoformat(),
+            "execution_time": completed_at,
+            "completed_at": completed_at,
+            "duration_s": time.monotonic() - started,
             "total_steps": total_steps,
             "successful_steps": successful_steps,
             "failed_steps": total_steps - successful_steps,
             "dynamic_steps_created": len([s for s in workflow_plan.steps if s.get("delegating_agent_id")]),
-            "iterations": iteration,
+            "launched_steps": launched,
         }
 
-    def _get_next_executable_steps(
-        self, all_steps: List[Dict[str, Any]], executed_steps: set, execution_results: Dict[str, Any]
-    ) -> List[Dict[str, Any]]:
-        """Get steps that can be executed next based on dependencies."""
-        executable = []
-
-        for step in all_steps:
-            step_id = step["step_id"]
-
-            # Skip already executed steps
-            if step_id in executed_steps:
-                continue
+    async def _run_one(
+        self, step: Dict[str, Any], step_agents: Dict[str, str], intelligence_level: IntelligenceLevel, workflow_id: str
+    ) -> Dict[str, Any]:
+        """Run one step with delegation support, turning any failure into a failed result"""
+        step_id = step["step_id"]
 
-            # Check if all dependencies are satisfied
-            dependencies = step.get("dependencies", [])
-            dependencies_satisfied = all(
-                dep_id in executed_steps and execution_results.get(dep_id, {}).get("status") == "completed"
-                for dep_id in dependencies
-            )
+        try:
+            # Delegated steps name their target agent; regular steps use the agent created for them
+            executing_agent_id = step.get("target_agent_id") or step_agents.get(step_id)
+            if not executing_agent_id:
+                raise ValueError(f"No agent available for step {step_id}")
 
-            if dependencies_satisfied:
-                executable.append(step)
+            # Execute the step with delegation support
+            result = await self._execute_step_with_delegation(step, executing_agent_id, intelligence_level, workflow_id)
+            logger.info("Step %s completed successfully", step_id)
+            return result
 
-        return executable
+        except Exception as e:
+            logger.error("Step %s failed: %s", step_id, e)
+            return {"status": "failed", "error": str(e)}
 
     async def _execute_step_with_delegation(
         self, step: Dict[str, Any], agent_id: str, intelligence_level: IntelligenceLevel, workflow_id: str
@@ -694,20 +1125,24 @@ class TaskService:
         }
 
         # Use enhanced agent execution that supports delegation
+        started = time.monotonic()
         result = await self.agent_service.execute_agent_task_with_delegation(
             agent_id=agent_id,
             task_data={
                 "action": step.get("action", ""),
                 "inputs": step.get("inputs", {}),
                 "step_context": step_context,
-                "intelligence_level": intelligence_level.value,
+                "intelligence_level": _LEVEL_STR[intelligence_level],
             },
         )
 
+        completed_at = datetime.now().isoformat()
         return {
             "status": "completed",
             "result": result,
             "delegated_tasks": result.get("delegated_tasks", []),
             "agent_id": agent_id,
-            "execution_time": datetime.now().isoformat(),
+            "execution_time": completed_at,
+            "completed_at": completed_at,
+            "duration_s": time.monotonic() - started,
         }
@@ -1,6 +1,7 @@
 """Workflow service for managing LangGraph workflows."""
 
 import uuid
+from collections import Counter
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from app.models.schemas import WorkflowCreate, WorkflowResponse, WorkflowList, WorkflowStatus
@@ -14,6 +15,7 @@ class WorkflowService(LoggerMixin):
     def __init__(self):
         # In-memory storage for MVP (would be replaced with database)
         self._workflows: Dict[str, WorkflowResponse] = {}
+        self._names: Dict[str, str] = {}  # workflow name -> id, for O(1) uniqueness checks
         self.logger.info("WorkflowService initialized")
 
     @handle_service_error
@@ -42,6 +44,7 @@ class WorkflowService(LoggerMixin):
 
         # Store workflow
         self._workflows[workflow_id] = workflow
+        self._names[workflow.name] = workflow_id
 
         log_workflow_event(workflow_id, "created", {"name": workflow.name, "description": workflow.description})
 
@@ -76,11 +79,25 @@ class WorkflowService(LoggerMixin):
         if not workflow:
             return None
 
+        old_name = workflow.name
+
+        # Reject renames onto a name another workflow already uses
+        new_name = updates.get("name", old_name)
+        if new_name != old_name:
+            owner_id = self._names.get(new_name)
+            if owner_id is not None and owner_id != workflow_id:
+                raise WorkflowAlreadyExistsError(owner_id)
+
         # Update fields
         for field, value in updates.items():
             if hasattr(workflow, field):
                 setattr(workflow, field, value)
 
+        if workflow.name != old_name:
+            if self._names.get(old_name) == workflow_id:
+                del self._names[old_name]
+            self._names.setdefault(workflow.name, workflow_id)
+
         # Update last modified timestamp
         workflow.last_modified = datetime.now()
 
@@ -107,6 +124,10 @@ class WorkflowService(LoggerMixin):
 
             # Now delete the workflow
             del self._workflows[workflow_id]
+            if self._names.get(workflow.name) == workflow_id:
+                del self._names[workflow.name]
+            if agent_service:
+                agent_service.unregister_workflow(workflow_id)
 
             log_workflow_event(workflow_id, "deleted", {"name": workflow.name, "agent_count": workflow.agent_count})
 
@@ -123,6 +144,9 @@ class WorkflowService(LoggerMixin):
         if not workflow:
             return None
 
+        # One pass over the agents for all three status counts
+        status_counts = Counter(agent.status for agent in workflow.agents)
+
         stats = {
             "workflow_id": workflow_id,
             "name": workflow.name,
@@ -130,9 +154,9 @@ class WorkflowService(LoggerMixin):
             "created_at": workflow.created_at,
             "last_modified": workflow.last_modified,
             "agent_count": workflow.agent_count,
-            "active_agents": len([a for a in workflow.agents if a.status == "running"]),
-            "idle_agents": len([a for a in workflow.agents if a.status == "idle"]),
-            "error_agents": len([a for a in workflow.agents if a.status == "error"]),
+            "active_agents": status_counts["running"],
+            "idle_agents": status_counts["idle"],
+            "error_agents": status_counts["error"],
         }
 
         return stats
@@ -156,9 +180,10 @@ class WorkflowService(LoggerMixin):
     # Helper methods
     def _find_workflow_by_name(self, name: str) -> Optional[WorkflowResponse]:
         """Find workflow by name."""
-        for workflow in self._workflows.values():
-            if workflow.name == name:
-                return workflow
+        # Checked against _workflows so an index entry left behind by a removed workflow never matches
+        workflow = self._workflows.get(self._names.get(name))
+        if workflow is not None and workflow.name == name:
+            return workflow
         return None
 
     def _validate_workflow_data(self, workflow_data: WorkflowCreate) -> None:
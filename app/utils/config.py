@@ -37,6 +37,11 @@ class Settings(BaseSettings):
     max_child_agents: int = Field(default=10, alias="MAX_CHILD_AGENTS")
     agent_timeout: int = Field(default=300, alias="AGENT_TIMEOUT")  # seconds
 
+    # Task service memory bounds (executions and plans are persisted; these cap the in-memory copies)
+    max_task_executions: int = Field(default=10000, alias="MAX_TASK_EXECUTIONS")
+    max_workflow_plans: int = Field(default=10000, alias="MAX_WORKFLOW_PLANS")
+    task_retention_seconds: int = Field(default=3600, alias="TASK_RETENTION_SECONDS")
+
     # Resource limits
     max_memory_usage: int = Field(default=1024, alias="MAX_MEMORY_USAGE")  # MB
     max_cpu_usage: float = Field(default=80.0, alias="MAX_CPU_USAGE")  # percentage
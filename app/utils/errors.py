@@ -121,6 +121,20 @@ class AgentSpawnError(AgentError):
         )
 
 
+class ConcurrentDelegationError(AgentError):
+    """Raised when a task was reassigned by someone else since the caller read it."""
+
+    def __init__(self, task_id: str, expected_version: int, actual_version: int):
+        super().__init__(
+            message=(
+                f"Task '{task_id}' was modified concurrently "
+                f"(expected version {expected_version}, found {actual_version})"
+            ),
+            error_code="CONCURRENT_DELEGATION",
+            details={"task_id": task_id, "expected_version": expected_version, "actual_version": actual_version},
+        )
+
+
 # Resource-related exceptions
 class ResourceError(BaseAppException):
     """Base class for resource-related errors."""
@@ -240,6 +254,7 @@ async def app_exception_handler(request: Request, exc: BaseAppException) -> JSON
         AgentNotFoundError: 404,
         WorkflowAlreadyExistsError: 409,
         AgentAlreadyExistsError: 409,
+        ConcurrentDelegationError: 409,
         AgentLimitExceededError: 429,
         ResourceLimitExceededError: 429,
         ValidationError: 400,
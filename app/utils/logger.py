@@ -1,11 +1,13 @@
 """Logging configuration for LangGraph Agent Management System."""
 
+import atexit
 import logging
 import logging.handlers
 import os
+import queue
 import sys
 from datetime import datetime
-from typing import Optional
+from typing import Callable, Optional, Sequence, Union
 from app.utils.config import get_settings
 
 
@@ -28,8 +30,27 @@ class ColoredFormatter(logging.Formatter):
         return super().format(record)
 
 
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _stop_queue_listener() -> None:
+    """Flush and stop the background log listener, if running."""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+
+atexit.register(_stop_queue_listener)
+
+
 def setup_logging(log_level: Optional[str] = None, log_file: Optional[str] = None) -> None:
-    """Set up logging configuration."""
+    """Set up logging configuration.
+
+    Records are handed to a queue and written by a background listener thread, so request handlers
+    emitting fire-and-forget events (delegation, spawning, notifications) never block on console or file I/O.
+    """
+    global _queue_listener
     settings = get_settings()
 
     # Use provided values or fall back to settings
@@ -40,8 +61,10 @@ def setup_logging(log_level: Optional[str] = None, log_file: Optional[str] = Non
     root_logger = logging.getLogger()
     root_logger.setLevel(getattr(logging, log_level.upper()))
 
-    # Clear existing handlers
+    # Clear existing handlers and any listener from a previous call
     root_logger.handlers.clear()
+    _stop_queue_listener()
+    handlers = []
 
     # Console handler with colors
     console_handler = logging.StreamHandler(sys.stdout)
@@ -49,7 +72,7 @@ def setup_logging(log_level: Optional[str] = None, log_file: Optional[str] = Non
         fmt="%(asctime)s - %(name)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
     )
     console_handler.setFormatter(console_formatter)
-    root_logger.addHandler(console_handler)
+    handlers.append(console_handler)
 
     # File handler if log file is specified
     if log_file:
@@ -64,7 +87,13 @@ def setup_logging(log_level: Optional[str] = None, log_file: Optional[str] = Non
             fmt="%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
         )
         file_handler.setFormatter(file_formatter)
-        root_logger.addHandler(file_handler)
+        handlers.append(file_handler)
+
+    # Handlers run on the listener thread; the root logger only enqueues
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _queue_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _queue_listener.start()
 
     # Set specific logger levels
     logging.getLogger("uvicorn").setLevel(logging.INFO)
@@ -86,8 +115,13 @@ class LoggerMixin:
 
     @property
     def logger(self) -> logging.Logger:
-        """Get logger for this class."""
-        return logging.getLogger(self.__class__.__name__)
+        """Get logger for this class, resolved once per class and cached on it."""
+        cls = self.__class__
+        logger = cls.__dict__.get("_class_logger")
+        if logger is None:
+            logger = logging.getLogger(cls.__name__)
+            cls._class_logger = logger
+        return logger
 
 
 # Context manager for logging function execution
@@ -130,31 +164,50 @@ def log_function_call(logger: Optional[logging.Logger] = None, log_level: int =
 
 
 # Utility functions for structured logging
-def log_agent_event(agent_id: str, event: str, details: Optional[dict] = None):
-    """Log agent-related events."""
-    logger = logging.getLogger("agent_events")
-    message = f"Agent {agent_id}: {event}"
+EventDetails = Optional[Union[dict, Callable[[], dict]]]
+
+_agent_event_logger = logging.getLogger("agent_events")
+_workflow_event_logger = logging.getLogger("workflow_events")
+_performance_logger = logging.getLogger("performance")
+_error_logger = logging.getLogger("errors")
+
+
+def _log_event(logger: logging.Logger, kind: str, entity_id: str, event: str, details: EventDetails) -> None:
+    """Emit an event, building details only when INFO is enabled.
+
+    ``details`` may be a zero-argument callable so callers can defer building the payload.
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    if callable(details):
+        details = details()
     if details:
-        message += f" - {details}"
-    logger.info(message)
+        logger.info("%s %s: %s - %s", kind, entity_id, event, details)
+    else:
+        logger.info("%s %s: %s", kind, entity_id, event)
 
 
-def log_workflow_event(workflow_id: str, event: str, details: Optional[dict] = None):
+def log_agent_event(agent_id: str, event: str, details: EventDetails = None):
+    """Log agent-related events."""
+    _log_event(_agent_event_logger, "Agent", agent_id, event, details)
+
+
+def log_agent_events(agent_ids: Sequence[str], event: str, details: EventDetails = None):
+    """Log one event shared by many agents as a single record (fan-out notifications)."""
+    if agent_ids:
+        _log_event(_agent_event_logger, "Agents", ", ".join(agent_ids), event, details)
+
+
+def log_workflow_event(workflow_id: str, event: str, details: EventDetails = None):
     """Log workflow-related events."""
-    logger = logging.getLogger("workflow_events")
-    message = f"Workflow {workflow_id}: {event}"
-    if details:
-        message += f" - {details}"
-    logger.info(message)
+    _log_event(_workflow_event_logger, "Workflow", workflow_id, event, details)
 
 
 def log_performance_metric(metric_name: str, value: float, unit: str = ""):
     """Log performance metrics."""
-    logger = logging.getLogger("performance")
-    logger.info(f"METRIC: {metric_name} = {value} {unit}")
+    _performance_logger.info("METRIC: %s = %s %s", metric_name, value, unit)
 
 
 def log_error_with_context(error: Exception, context: dict):
     """Log error with additional context."""
-    logger = logging.getLogger("errors")
-    logger.error(f"Error: {str(error)}", extra={"context": context}, exc_info=True)
+    _error_logger.error("Error: %s", error, extra={"context": context}, exc_info=True)
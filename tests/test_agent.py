@@ -10,10 +10,12 @@ from app.models.schemas import (
     AgentStatusUpdate,
     LLMConfig,
     MCPConnection,
+    Task,
     WorkflowCreate,
 )
 from app.services.agent_service import AgentService
 from app.services.workflow_service import WorkflowService
+from app.utils.errors import ConcurrentDelegationError, WorkflowNotFoundError
 
 
 @pytest.fixture
@@ -78,6 +80,45 @@ class TestAgentService:
         assert len(agent.tasks) == 0
         assert isinstance(agent.created_at, datetime)
 
+    @pytest.mark.asyncio
+    async def test_create_agent_idempotent(self, agent_service, sample_workflow, sample_agent_data):
+        """Test repeated creates with the same idempotency key return the original agent."""
+        first = await agent_service.create_agent(sample_workflow.id, sample_agent_data, idempotency_key="deploy-1")
+        repeat = await agent_service.create_agent(sample_workflow.id, sample_agent_data, idempotency_key="deploy-1")
+        fresh = await agent_service.create_agent(sample_workflow.id, sample_agent_data, idempotency_key="deploy-2")
+        unkeyed = await agent_service.create_agent(sample_workflow.id, sample_agent_data)
+
+        assert repeat.id == first.id
+        assert fresh.id != first.id
+        assert unkeyed.id not in (first.id, fresh.id)
+        assert len(await agent_service.get_workflow_agents(sample_workflow.id)) == 3
+
+    @pytest.mark.asyncio
+    async def test_deleted_agent_releases_idempotency_key(self, agent_service, sample_workflow, sample_agent_data):
+        """Test deleting an agent drops its idempotency entry so the map stays bounded."""
+        first = await agent_service.create_agent(sample_workflow.id, sample_agent_data, idempotency_key="deploy-1")
+        await agent_service.delete_agent(first.id)
+
+        assert agent_service._create_cache == {}
+        assert agent_service._create_cache_keys == {}
+        again = await agent_service.create_agent(sample_workflow.id, sample_agent_data, idempotency_key="deploy-1")
+        assert again.id != first.id
+
+    @pytest.mark.asyncio
+    async def test_create_agent_checks_workflow_once(self, workflow_service, sample_workflow, sample_agent_data):
+        """Test creates validate the workflow, cache it, and reject it again after deletion."""
+        service = AgentService(workflow_service=workflow_service)
+
+        with pytest.raises(WorkflowNotFoundError):
+            await service.create_agent("missing-workflow", sample_agent_data)
+
+        await service.create_agent(sample_workflow.id, sample_agent_data)
+        assert sample_workflow.id in service._known_workflow_ids
+
+        await workflow_service.delete_workflow(sample_workflow.id, service)
+        with pytest.raises(WorkflowNotFoundError):
+            await service.create_agent(sample_workflow.id, sample_agent_data)
+
     @pytest.mark.asyncio
     async def test_get_agent(self, agent_service, sample_workflow, sample_agent_data):
         """Test agent retrieval."""
@@ -115,6 +156,26 @@ class TestAgentService:
         assert len(agent_list.agents) == 1
         assert agent_list.agents[0].name == sample_agent_data.name
 
+    @pytest.mark.asyncio
+    async def test_list_agents_newest_first_after_delete(self, agent_service, sample_workflow, sample_agent_data):
+        """Test listing returns agents newest first and skips deleted agents."""
+        created = [await agent_service.create_agent(sample_workflow.id, sample_agent_data) for _ in range(3)]
+        await agent_service.delete_agent(created[1].id)
+
+        agent_list = await agent_service.list_agents(sample_workflow.id)
+        assert [a.id for a in agent_list.agents] == [created[2].id, created[0].id]
+        assert agent_list.total == 2
+
+    @pytest.mark.asyncio
+    async def test_deleting_last_agent_drops_workflow_index(self, agent_service, sample_workflow, sample_agent_data):
+        """Test a workflow's agent index is removed once its last agent is deleted."""
+        agent = await agent_service.create_agent(sample_workflow.id, sample_agent_data)
+        await agent_service.delete_agent(agent.id)
+
+        assert sample_workflow.id not in agent_service._workflow_agents
+        assert sample_workflow.id not in agent_service._workflow_agents_ordered
+        assert (await agent_service.list_agents(sample_workflow.id)).total == 0
+
     @pytest.mark.asyncio
     async def test_update_agent(self, agent_service, sample_workflow, sample_agent_data):
         """Test agent update."""
@@ -143,6 +204,22 @@ class TestAgentService:
         retrieved_agent = await agent_service.get_agent(agent.id)
         assert retrieved_agent is None
 
+    @pytest.mark.asyncio
+    async def test_delete_agent_removes_descendants(self, agent_service, sample_workflow, sample_agent_data):
+        """Test deleting a parent also deletes its child and grandchild agents."""
+        parent = await agent_service.create_agent(sample_workflow.id, sample_agent_data)
+        child = await agent_service.spawn_child_agent(parent.id, sample_agent_data.model_copy())
+        grandchild = await agent_service.spawn_child_agent(child.id, sample_agent_data.model_copy())
+        sibling = await agent_service.create_agent(sample_workflow.id, sample_agent_data)
+        await agent_service.connect_agents(sibling.id, grandchild.id)
+
+        assert await agent_service.delete_agent(parent.id) is True
+
+        for agent_id in (parent.id, child.id, grandchild.id):
+            assert await agent_service.get_agent(agent_id) is None
+        assert await agent_service.get_workflow_agents(sample_workflow.id) == [sibling.id]
+        assert (await agent_service.get_agent(sibling.id)).connected_agents == []
+
     @pytest.mark.asyncio
     async def test_connect_agents(self, agent_service, sample_workflow, sample_agent_data):
         """Test connecting two agents."""
@@ -177,6 +254,49 @@ class TestAgentService:
         assert status.active_tasks == 0
         assert status.completed_tasks == 0
 
+    @pytest.mark.asyncio
+    async def test_get_agent_status_task_counts(self, agent_service, sample_workflow, sample_agent_data):
+        """Test status reports running and completed task counts."""
+        agent = await agent_service.create_agent(sample_workflow.id, sample_agent_data)
+        for i, task_status in enumerate(["running", "completed", "completed", "pending"]):
+            task = Task(id=f"task-{i}", title=f"Task {i}", description="Count me", status=task_status)
+            await agent_service.assign_task(agent.id, task)
+
+        status = await agent_service.get_agent_status(agent.id)
+
+        assert status.active_tasks == 1
+        assert status.completed_tasks == 2
+
+    @pytest.mark.asyncio
+    async def test_notify_task_completion_finds_task_by_id(self, agent_service, sample_workflow, sample_agent_data):
+        """Test completion notifications look up assigned tasks by ID."""
+        agent = await agent_service.create_agent(sample_workflow.id, sample_agent_data)
+        task = Task(id="task-1", title="Task 1", description="Finish me", status="running")
+        await agent_service.assign_task(agent.id, task)
+
+        assert await agent_service.notify_task_completion(agent.id, "missing-task", {}) is False
+        assert await agent_service.notify_task_completion(agent.id, "task-1", {"ok": True}) is True
+        assert (await agent_service.get_agent_status(agent.id)).completed_tasks == 1
+
+    @pytest.mark.asyncio
+    async def test_delegate_task_rejects_stale_version(self, agent_service, sample_workflow, sample_agent_data):
+        """Test delegation is a compare-and-swap on the task version."""
+        source = await agent_service.create_agent(sample_workflow.id, sample_agent_data)
+        target_data = sample_agent_data.model_copy()
+        target_data.name = "Target Agent"
+        target = await agent_service.create_agent(sample_workflow.id, target_data)
+        await agent_service.connect_agents(source.id, target.id)
+
+        task = Task(id="task-1", title="Task 1", description="Hand me off")
+        stale = task.version
+        assert await agent_service.delegate_task(source.id, target.id, task) is True
+        assert task.version == stale + 1
+        assert task.assigned_to == target.id
+
+        with pytest.raises(ConcurrentDelegationError):
+            await agent_service.delegate_task(target.id, source.id, task, expected_version=stale)
+        assert task.assigned_to == target.id
+
     @pytest.mark.asyncio
     async def test_spawn_child_agent(self, agent_service, sample_workflow, sample_agent_data):
         """Test spawning a child agent."""
@@ -230,3 +350,41 @@ class TestAgentService:
         agent_ids = await agent_service.get_workflow_agents(sample_workflow.id)
         assert len(agent_ids) == 1
         assert agent.id in agent_ids
+
+    @pytest.mark.asyncio
+    async def test_file_agent_json_read(self, agent_service, sample_workflow, sample_agent_data, tmp_path):
+        """Test file agents parse JSON files."""
+        file_path = tmp_path / "payload.json"
+        file_path.write_text('{"name": "agent", "values": [1, 2, 3]}')
+        file_agent_data = sample_agent_data.model_copy(update={"agent_type": AgentType.FILE_AGENT})
+        agent = await agent_service.create_agent(sample_workflow.id, file_agent_data)
+
+        result = await agent_service.execute_agent_task(
+            agent.id, {"action": "json_read", "inputs": {"file_path": str(file_path)}}
+        )
+
+        assert result["status"] == "success"
+        assert result["data"] == {"name": "agent", "values": [1, 2, 3]}
+
+    @pytest.mark.asyncio
+    async def test_broadcast_logs_one_record_per_fanout(self, agent_service, sample_workflow, sample_agent_data, caplog):
+        """Test a status broadcast logs a single event covering every connected agent."""
+        hub, *spokes = [await agent_service.create_agent(sample_workflow.id, sample_agent_data) for _ in range(3)]
+        for spoke in spokes:
+            await agent_service.connect_agents(hub.id, spoke.id)
+
+        with caplog.at_level("INFO", logger="agent_events"):
+            assert await agent_service.broadcast_status_change(hub.id, AgentStatusEnum.BUSY, "busy") is True
+
+        records = [r.getMessage() for r in caplog.records if "status_change_broadcast" in r.getMessage()]
+        assert len(records) == 1
+        assert all(spoke.id in records[0] for spoke in spokes)
+
+    def test_next_id_generates_unique_uuid4(self, agent_service):
+        """Test batched ID generation yields unique version-4 UUIDs across refills."""
+        import uuid
+
+        ids = [agent_service._next_id() for _ in range(AgentService._UUID_BATCH_SIZE * 2 + 1)]
+
+        assert len(set(ids)) == len(ids)
+        assert all(uuid.UUID(agent_id).version == 4 for agent_id in ids)
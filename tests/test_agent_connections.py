@@ -319,3 +319,23 @@ class TestAgentConnections:
             connections = response.json()
             assert len(connections) == 1
             assert connections[0]["id"] == agent_ids[0]
+
+    def test_delegation_with_stale_version_returns_conflict(self):
+        """Test the delegate endpoint rejects a stale expected_version with 409."""
+        workflow_id = self.create_test_workflow()
+        agent1_id = self.create_test_agent(workflow_id, "Agent 1")
+        agent2_id = self.create_test_agent(workflow_id, "Agent 2")
+        client.post(f"/agents/{agent1_id}/connect", json={"target_agent_id": agent2_id})
+
+        handoff = {"task_id": "task-1", "target_agent_id": agent2_id, "expected_version": 0}
+        response = client.post(f"/agents/{agent1_id}/delegate", json=handoff)
+        assert response.status_code == 200
+        assert response.json()["version"] == 1
+
+        stale = {"task_id": "task-1", "target_agent_id": agent1_id, "expected_version": 0}
+        response = client.post(f"/agents/{agent2_id}/delegate", json=stale)
+        assert response.status_code == 409
+
+        current = {"task_id": "task-1", "target_agent_id": agent1_id, "expected_version": 1}
+        response = client.post(f"/agents/{agent2_id}/delegate", json=current)
+        assert response.status_code == 200
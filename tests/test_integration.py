@@ -207,6 +207,15 @@ class TestIntegration:
         response = client.get("/agents/non-existent-id")
         assert response.status_code == 404
 
+    def test_create_agent_in_missing_workflow(self):
+        """Test creating an agent in an unknown workflow returns 404."""
+        agent_data = {"name": "Orphan Agent", "agent_type": "main", "llm_config": {"provider": "openai", "model": "gpt-4"}}
+
+        response = client.post("/workflows/non-existent-workflow/agents", json=agent_data)
+
+        assert response.status_code == 404
+        assert "non-existent-workflow" in response.json()["detail"]
+
     def test_agent_workflow_integration(self):
         """Test agent-workflow integration."""
         # Create workflow
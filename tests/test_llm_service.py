@@ -0,0 +1,327 @@
+"""Tests for LLM service helpers."""
+
+import json
+import subprocess
+import sys
+from datetime import datetime
+
+import pytest
+
+from app.services.llm_service import CostTracker, InferenceType, LLMProvider, LLMRequest, LLMResponse, LLMServiceFactory
+
+
+@pytest.fixture
+def llm_service():
+    """Create an LLM service without touching the network."""
+    return LLMServiceFactory.create_service(provider="openai", model="gpt-4", api_key="test-key")
+
+
+class TestLLMService:
+    """Test LLM service functionality."""
+
+    @pytest.mark.asyncio
+    async def test_service_owns_and_closes_its_http_client(self, llm_service):
+        """Test each service gets its own pooled HTTP client and closes it on shutdown."""
+        other = LLMServiceFactory.create_service(provider="openai", model="gpt-4o", api_key="other-key")
+        assert other.client._client is not llm_service.client._client
+
+        await llm_service.close()
+
+        assert llm_service.client._client.is_closed
+        assert not other.client._client.is_closed
+
+    def test_cache_key_is_stable_across_processes(self, llm_service):
+        """Test cache keys do not depend on the per-process hash seed."""
+        request = LLMRequest(prompt="plan this", inference_type=InferenceType.PLANNING, context={"a": 1})
+        script = (
+            "from app.services.llm_service import InferenceType, LLMRequest, LLMServiceFactory\n"
+            "service = LLMServiceFactory.create_service(provider='openai', model='gpt-4', api_key='test-key')\n"
+            "request = LLMRequest(prompt='plan this', inference_type=InferenceType.PLANNING, context={'a': 1})\n"
+            "print(service._generate_cache_key(request))\n"
+        )
+        other_process_key = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+
+        assert llm_service._generate_cache_key(request) == other_process_key
+
+    def test_cache_key_separates_request_fields(self, llm_service):
+        """Test per-request fields are hashed unambiguously."""
+
+        def key(**kwargs):
+            return llm_service._generate_cache_key(LLMRequest(inference_type=InferenceType.PLANNING, **kwargs))
+
+        assert key(prompt="ab", system_prompt="c") != key(prompt="a", system_prompt="bc")
+        assert key(prompt="a", system_prompt=None) != key(prompt="a", system_prompt="")
+        assert key(prompt="a", context={"x": 1, "y": 2}) == key(prompt="a", context={"y": 2, "x": 1})
+        assert key(prompt="a") != key(prompt="a", context={})
+
+    def test_memory_cache_is_lru_bounded(self, llm_service):
+        """Test the in-process response cache evicts least recently used entries."""
+        llm_service.cache = None  # keep the test off the on-disk cache (its writes need a running loop)
+        llm_service._MEM_CACHE_MAX = 2
+        responses = {
+            key: LLMResponse(
+                content=key,
+                provider=LLMProvider.OPENAI,
+                model="gpt-4",
+                tokens_used=1,
+                cost_estimate=0.0,
+                inference_type=InferenceType.PLANNING,
+                timestamp=datetime.now(),
+            )
+            for key in ("a", "b", "c")
+        }
+
+        llm_service._cache_set("a", responses["a"])
+        llm_service._cache_set("b", responses["b"])
+        assert llm_service._cache_get("a") is responses["a"]  # refresh "a"
+        llm_service._cache_set("c", responses["c"])
+
+        assert llm_service._cache_get("b") is None
+        assert llm_service._cache_get("a") is responses["a"]
+        assert llm_service._cache_get("c") is responses["c"]
+
+    def test_llm_response_round_trips_through_pickle(self):
+        """Test slotted responses can still be stored in the disk cache."""
+        import pickle
+
+        response = LLMResponse(
+            content="{}",
+            provider=LLMProvider.OPENAI,
+            model="gpt-4",
+            tokens_used=10,
+            cost_estimate=0.02,
+            inference_type=InferenceType.DYNAMIC,
+            timestamp=datetime.now(),
+        )
+
+        assert pickle.loads(pickle.dumps(response)) == response
+
+
+class TestCostTracker:
+    """Test LLM cost tracking."""
+
+    @staticmethod
+    def _response(provider, inference_type, cost, cached=False):
+        return LLMResponse(
+            content="",
+            provider=provider,
+            model="test-model",
+            tokens_used=100,
+            cost_estimate=cost,
+            inference_type=inference_type,
+            timestamp=datetime.now(),
+            cached=cached,
+        )
+
+    def test_stats_cover_all_records(self):
+        """Test stats count every record while the usage log keeps only the most recent ones."""
+        tracker = CostTracker(capacity=3)
+        tracker.add_usage(self._response(LLMProvider.GOOGLE, InferenceType.PLANNING, 5.0))
+        tracker.add_usage(self._response(LLMProvider.OPENAI, InferenceType.PLANNING, 1.0))
+        tracker.add_usage(self._response(LLMProvider.OPENAI, InferenceType.DYNAMIC, 2.0))
+        tracker.add_usage(self._response(LLMProvider.ANTHROPIC, InferenceType.DYNAMIC, 4.0, cached=True))
+
+        stats = tracker.get_stats()
+
+        assert stats["total_requests"] == 4
+        assert stats["total_cost"] == 8.0
+        assert stats["cache_hit_rate"] == 0.25
+        assert stats["requests_by_type"] == {"planning": 2, "dynamic": 2}
+        assert stats["cost_by_provider"] == {"google": 5.0, "openai": 3.0}
+        assert [r["cost"] for r in tracker.usage_log] == [1.0, 2.0, 4.0]
+
+
+class TestLLMRequest:
+    """Test LLM request helpers."""
+
+    def test_encoded_context_is_computed_once(self):
+        """Test the serialized context is cached on the request."""
+        request = LLMRequest(prompt="p", inference_type=InferenceType.DYNAMIC, context={"step": 1})
+
+        encoded = request.encoded_context
+
+        assert encoded == '{"step":1}'
+        assert request.encoded_context is encoded
+
+
+class TestExecuteRequest:
+    """Test the shared request path."""
+
+    @pytest.mark.asyncio
+    async def test_execute_request_logs_and_caches_response(self, llm_service, caplog):
+        """Test a provider response is logged at DEBUG, cached and served from cache on repeat."""
+        calls = []
+
+        async def fake_openai_request(request):
+            calls.append(request)
+            return LLMResponse(
+                content="{}",
+                provider=LLMProvider.OPENAI,
+                model="gpt-4",
+                tokens_used=42,
+                cost_estimate=0.01,
+                inference_type=request.inference_type,
+                timestamp=datetime.now(),
+            )
+
+        llm_service._execute_openai_request = fake_openai_request
+        llm_service.cache = None  # keep the test off the on-disk cache
+        request = LLMRequest(prompt="plan", inference_type=InferenceType.PLANNING, context={"k": "v"})
+
+        with caplog.at_level("DEBUG", logger="app.services.llm_service"):
+            first = await llm_service._execute_request(request)
+        second = await llm_service._execute_request(request)
+
+        assert len(calls) == 1
+        assert first.cached is False
+        assert second.cached is True
+        assert any("Total=42" in r.getMessage() for r in caplog.records)
+
+    @pytest.mark.asyncio
+    async def test_disk_cache_writes_are_batched_in_background(self, llm_service):
+        """Test disk cache writes are queued and flushed in one transaction."""
+        from contextlib import contextmanager
+
+        class FakeDiskCache:
+            def __init__(self):
+                self.data = {}
+                self.transactions = 0
+
+            @contextmanager
+            def transact(self):
+                self.transactions += 1
+                yield
+
+            def set(self, key, value, expire=None):
+                self.data[key] = value
+
+            def get(self, key):
+                return self.data.get(key)
+
+        disk = FakeDiskCache()
+        llm_service.cache = disk
+        response = LLMResponse(
+            content="{}",
+            provider=LLMProvider.OPENAI,
+            model="gpt-4",
+            tokens_used=1,
+            cost_estimate=0.0,
+            inference_type=InferenceType.PLANNING,
+            timestamp=datetime.now(),
+        )
+
+        for key in ("a", "b", "c"):
+            llm_service._cache_set(key, response)
+        assert disk.data == {}  # nothing written inline
+
+        await llm_service.close()
+
+        assert set(disk.data) == {"a", "b", "c"}
+        assert disk.transactions == 1
+
+
+class TestBatchDynamicInference:
+    """Test batched dynamic inference."""
+
+    @staticmethod
+    def _reply(content, inference_type):
+        return LLMResponse(
+            content=content,
+            provider=LLMProvider.OPENAI,
+            model="gpt-4",
+            tokens_used=90,
+            cost_estimate=0.03,
+            inference_type=inference_type,
+            timestamp=datetime.now(),
+        )
+
+    @pytest.mark.asyncio
+    async def test_one_call_is_split_per_situation(self, llm_service):
+        """Test several situations share one request and each gets its own result."""
+        calls = []
+
+        async def fake_openai_request(request):
+            calls.append(request)
+            content = json.dumps({"results": [{"recommended_action": "retry"}, {"recommended_action": "skip"}]})
+            return self._reply(content, request.inference_type)
+
+        llm_service._execute_openai_request = fake_openai_request
+        llm_service.cache = None
+
+        responses = await llm_service.batch_dynamic_inference(
+            ["step-1 failed", "step-2 failed"], [{"step": 1}, {"step": 2}], InferenceType.ERROR_RECOVERY
+        )
+
+        assert len(calls) == 1
+        assert [json.loads(r.content)["recommended_action"] for r in responses] == ["retry", "skip"]
+        assert sum(r.tokens_used for r in responses) == 90
+
+    @pytest.mark.asyncio
+    async def test_mismatched_reply_falls_back_to_individual_calls(self, llm_service):
+        """Test a batched reply with the wrong shape is retried one situation at a time."""
+        calls = []
+
+        async def fake_openai_request(request):
+            calls.append(request)
+            return self._reply('{"recommended_action": "retry"}', request.inference_type)
+
+        llm_service._execute_openai_request = fake_openai_request
+        llm_service.cache = None
+
+        responses = await llm_service.batch_dynamic_inference(
+            ["step-1 failed", "step-2 failed"], [{"step": 1}, {"step": 2}], InferenceType.ERROR_RECOVERY
+        )
+
+        assert len(calls) == 3
+        assert [r.content for r in responses] == ['{"recommended_action": "retry"}'] * 2
+
+    @pytest.mark.asyncio
+    async def test_failed_calls_only_fail_their_own_situation(self, llm_service):
+        """Test a failed batched call is retried individually and each failure stays with its situation."""
+        calls = []
+
+        async def fake_openai_request(request):
+            calls.append(request)
+            if len(calls) == 1 or "step-2" in request.prompt:
+                raise RuntimeError("rate limited")
+            return self._reply('{"recommended_action": "retry"}', request.inference_type)
+
+        llm_service._execute_openai_request = fake_openai_request
+        llm_service.cache = None
+
+        responses = await llm_service.batch_dynamic_inference(
+            ["step-1 failed", "step-2 failed"], [{"step": 1}, {"step": 2}], InferenceType.ERROR_RECOVERY
+        )
+
+        assert len(calls) == 3
+        assert responses[0].content == '{"recommended_action": "retry"}'
+        assert isinstance(responses[1], RuntimeError)
+
+
+class TestTokenCounting:
+    """Test token estimation."""
+
+    def test_count_tokens_falls_back_to_word_count(self, monkeypatch):
+        """Test token estimates fall back to whitespace-delimited words without an encoder."""
+        from app.services import llm_service
+
+        monkeypatch.setattr(llm_service, "_token_encoder", lambda: None)
+
+        assert llm_service._count_tokens("  one two\nthree  ") == 3
+        assert llm_service._count_tokens("") == 0
+
+    @pytest.mark.asyncio
+    async def test_warm_token_encoder_loads_off_the_event_loop(self, monkeypatch):
+        """Test the encoder warm-up runs the loader in a worker thread."""
+        import threading
+
+        from app.services import llm_service
+
+        loaded_on = []
+        monkeypatch.setattr(llm_service, "_token_encoder", lambda: loaded_on.append(threading.current_thread()))
+
+        await llm_service.warm_token_encoder()
+
+        assert loaded_on and loaded_on[0] is not threading.main_thread()
@@ -73,6 +73,22 @@ class TestPersistenceService:
         assert loaded_execution.result == {"output": "test result"}
         assert loaded_execution.task_data == {"request": "test", "response": "test"}
 
+    @pytest.mark.asyncio
+    async def test_task_execution_llm_interactions_round_trip(self, persistence_service):
+        """Test an execution's LLM interaction history is saved and loaded"""
+        execution = TaskExecution(
+            task_id="test-task-llm",
+            workflow_id="test-workflow-1",
+            agent_id="test-agent-1",
+            started_at=datetime.now(),
+        )
+        execution.record_llm_interaction({"type": "error_recovery", "timestamp": datetime(2030, 1, 1)})
+
+        assert await persistence_service.save_task_executions_batch([execution]) is True
+
+        loaded_execution = await persistence_service.load_task_execution("test-task-llm")
+        assert loaded_execution.llm_interactions == [{"type": "error_recovery", "timestamp": "2030-01-01 00:00:00"}]
+
     @pytest.mark.asyncio
     async def test_workflow_plan_persistence(self, persistence_service):
         """Test saving and loading workflow plans"""
@@ -3,12 +3,13 @@ Test suite for TaskService - Hybrid Intelligence Task Management
 Tests the core functionality that actually exists in the implementation.
 """
 
+import asyncio
 import pytest
 import json
 from unittest.mock import Mock, AsyncMock
 from datetime import datetime
 
-from app.services.task_service import TaskService, IntelligenceLevel, TaskStatus, WorkflowPlan, TaskExecution
+from app.services.task_service import TaskService, IntelligenceLevel, TaskStatus, WorkflowPlan, TaskExecution, _RecoveryBatcher
 from app.services.agent_service import AgentService
 from app.services.llm_service import LLMService
 
@@ -286,6 +287,506 @@ class TestTaskService:
         assert metrics["completed_tasks"] == 1
         assert metrics["failed_tasks"] == 0
 
+    def test_execution_order_respects_dependencies(self, task_service):
+        """Test steps are ordered after their dependencies, with cycles appended last"""
+        steps = [
+            {"step_id": "step-3", "dependencies": ["step-1", "step-2"]},
+            {"step_id": "step-1"},
+            {"step_id": "step-2", "dependencies": ["step-1", "external-step"]},
+            {"step_id": "loop-a", "dependencies": ["loop-b"]},
+            {"step_id": "loop-b", "dependencies": ["loop-a"]},
+        ]
+        task_service._create_task_dependencies(steps)
+
+        order = [step["step_id"] for step in task_service._get_execution_order(steps)]
+
+        assert order == ["step-1", "step-2", "step-3", "loop-a", "loop-b"]
+
+    @pytest.mark.asyncio
+    async def test_wait_for_dependencies_wakes_on_completion_event(self, task_service):
+        """Test dependents resume as soon as a dependency signals completion"""
+        task_service.task_dependencies["step-2"] = {"step-1", "external-step"}
+        execution_results = {}
+        step_events = {"step-1": asyncio.Event(), "step-2": asyncio.Event()}
+
+        waiter = asyncio.create_task(task_service._wait_for_dependencies("step-2", execution_results, step_events))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        execution_results["step-1"] = {"status": "completed"}
+        step_events["step-1"].set()
+        await asyncio.wait_for(waiter, timeout=1)
+
+        execution_results["step-1"] = {"status": "failed"}
+        with pytest.raises(Exception, match="Dependency step-1 failed"):
+            await task_service._wait_for_dependencies("step-2", execution_results, step_events)
+
+    @pytest.mark.asyncio
+    async def test_execute_workflow_runs_independent_steps_concurrently(self, task_service):
+        """Test independent steps overlap and dependents wait for them"""
+        steps = [
+            {"step_id": "fetch-a"},
+            {"step_id": "fetch-b"},
+            {"step_id": "merge", "dependencies": ["fetch-a", "fetch-b"]},
+        ]
+        task_service.workflow_plans["wf"] = WorkflowPlan(workflow_id="wf", title="Fan-in", description="", steps=steps)
+        task_service._create_task_dependencies(steps)
+        task_service._create_agents_for_workflow = AsyncMock(return_value={s["step_id"]: "agent" for s in steps})
+        both_started = asyncio.Barrier(2)
+        finished = []
+
+        async def fake_execute_step(step, agent_id, intelligence_level, workflow_id):
+            if step["step_id"] != "merge":
+                await asyncio.wait_for(both_started.wait(), timeout=1)
+            finished.append(step["step_id"])
+            return {"status": "completed"}
+
+        task_service._execute_step = fake_execute_step
+
+        result = await task_service.execute_workflow("wf")
+
+        assert result["status"] == "completed"
+        assert finished[-1] == "merge"
+        assert set(result["results"]) == {"fetch-a", "fetch-b", "merge"}
+        assert result["execution_time"] == result["completed_at"]
+        assert datetime.fromisoformat(result["completed_at"]) <= datetime.now()
+        assert isinstance(result["duration_s"], float)
+
+    @pytest.mark.asyncio
+    async def test_execute_workflow_skips_dependents_of_failed_step(self, task_service):
+        """Test a failed step halts the steps that depend on it"""
+        steps = [{"step_id": "step-1"}, {"step_id": "step-2", "dependencies": ["step-1"]}]
+        task_service.workflow_plans["wf"] = WorkflowPlan(workflow_id="wf", title="Chain", description="", steps=steps)
+        task_service._create_task_dependencies(steps)
+        task_service._create_agents_for_workflow = AsyncMock(return_value={s["step_id"]: "agent" for s in steps})
+        task_service._execute_step = AsyncMock(side_effect=RuntimeError("boom"))
+
+        result = await task_service.execute_workflow("wf")
+
+        assert result["status"] == "failed"
+        assert result["results"] == {"step-1": {"status": "failed", "error": "boom"}}
+        task_service._execute_step.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_agents_created_for_every_step(self, task_service, mock_agent_service):
+        """Test one agent is created per step and mapped back to its step"""
+        plan = WorkflowPlan(
+            workflow_id="wf", title="Batch", description="", steps=[{"step_id": "step-1"}, {"step_id": "step-2"}]
+        )
+        mock_agent_service.create_agent.side_effect = ["agent-1", "agent-2"]
+
+        step_agents = await task_service._create_agents_for_workflow(plan, IntelligenceLevel.BASIC)
+
+        assert step_agents == {"step-1": "agent-1", "step-2": "agent-2"}
+        assert mock_agent_service.create_agent.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_recovery_prompts_share_one_llm_call(self, task_service, mock_llm_service):
+        """Test recovery prompts raised together are sent as one batch"""
+        mock_llm_service.batch_dynamic_inference = AsyncMock(return_value=["recovery-1", "recovery-2"])
+
+        results = await asyncio.gather(
+            task_service._recovery_batcher.submit("step-1 failed", {"step": 1}),
+            task_service._recovery_batcher.submit("step-2 failed", {"step": 2}),
+        )
+
+        assert results == ["recovery-1", "recovery-2"]
+        mock_llm_service.batch_dynamic_inference.assert_awaited_once()
+        situations, contexts, _ = mock_llm_service.batch_dynamic_inference.await_args.args
+        assert situations == ["step-1 failed", "step-2 failed"]
+        assert contexts == [{"step": 1}, {"step": 2}]
+
+    @pytest.mark.asyncio
+    async def test_full_recovery_batch_is_sent_without_waiting(self):
+        """Test a batch reaching max_batch is sent before its window closes"""
+        flush = AsyncMock(return_value=["recovery-1", "recovery-2"])
+        batcher = _RecoveryBatcher(flush, window=10, max_batch=2)
+
+        results = await asyncio.wait_for(
+            asyncio.gather(batcher.submit("step-1 failed", {}), batcher.submit("step-2 failed", {})), timeout=1
+        )
+
+        assert results == ["recovery-1", "recovery-2"]
+        flush.assert_awaited_once()
+        assert batcher._flush_task is None
+
+    @pytest.mark.asyncio
+    async def test_recovery_batch_failure_stays_with_its_prompt(self):
+        """Test one failed prompt in a batch doesn't fail the others"""
+        flush = AsyncMock(return_value=["recovery-1", RuntimeError("rate limited")])
+        batcher = _RecoveryBatcher(flush, window=10, max_batch=2)
+
+        results = await asyncio.gather(
+            batcher.submit("step-1 failed", {}), batcher.submit("step-2 failed", {}), return_exceptions=True
+        )
+
+        assert results[0] == "recovery-1"
+        assert isinstance(results[1], RuntimeError)
+
+    @pytest.mark.asyncio
+    async def test_task_status_reuses_formatted_timestamps(self, task_service):
+        """Test ISO timestamps are formatted once and refreshed when the time changes"""
+        execution = TaskExecution(task_id="task-1", workflow_id="wf", agent_id="agent-1", started_at=datetime.now())
+        task_service.task_executions["task-1"] = execution
+
+        first = await task_service.get_task_status("task-1")
+        second = await task_service.get_task_status("task-1")
+        assert second["start_time"] is first["start_time"]
+        assert second["end_time"] is None
+
+        execution.completed_at = datetime(2030, 1, 1)
+        assert (await task_service.get_task_status("task-1"))["end_time"] == "2030-01-01T00:00:00"
+
+    def test_workflow_plan_steps_by_id_tracks_added_steps(self):
+        """Test the step index is reused and picks up appended steps"""
+        plan = WorkflowPlan(workflow_id="wf", title="Indexed", description="", steps=[{"step_id": "step-1"}])
+
+        index = plan.steps_by_id
+        assert plan.steps_by_id is index
+        assert list(index) == ["step-1"]
+
+        plan.steps.append({"step_id": "step-2"})
+        assert plan.steps_by_id["step-2"] is plan.steps[1]
+
+    @pytest.mark.asyncio
+    async def test_system_metrics_follow_status_transitions(self, task_service):
+        """Test completed/failed counts track inserts, transitions, replacement and removal"""
+        for task_id in ("task-1", "task-2"):
+            task_service.task_executions[task_id] = TaskExecution(
+                task_id=task_id, workflow_id="wf", agent_id="agent-1", status=TaskStatus.RUNNING
+            )
+        task_service.running_tasks.add("task-2")
+
+        task_service.task_executions.set_status(task_service.task_executions["task-1"], TaskStatus.COMPLETED)
+        await task_service.cancel_task("task-2")
+        metrics = await task_service.get_system_metrics()
+        assert (metrics["completed_tasks"], metrics["failed_tasks"]) == (1, 0)
+
+        task_service.task_executions["task-2"] = TaskExecution(
+            task_id="task-2", workflow_id="wf", agent_id="agent-1", status=TaskStatus.FAILED
+        )
+        del task_service.task_executions["task-1"]
+        metrics = await task_service.get_system_metrics()
+        assert (metrics["completed_tasks"], metrics["failed_tasks"]) == (0, 1)
+        assert task_service.task_executions.status_counts[TaskStatus.CANCELLED] == 0
+
+    def test_task_executions_evict_only_finished_entries(self, task_service):
+        """Test the execution store stays bounded without dropping active tasks"""
+        store = task_service.task_executions
+        store.max_size = 2
+        store["running"] = TaskExecution(task_id="running", workflow_id="wf", agent_id="a", status=TaskStatus.RUNNING)
+        store["done-1"] = TaskExecution(task_id="done-1", workflow_id="wf", agent_id="a", status=TaskStatus.COMPLETED)
+        store["done-2"] = TaskExecution(task_id="done-2", workflow_id="wf", agent_id="a", status=TaskStatus.COMPLETED)
+
+        assert list(store) == ["running", "done-2"]
+        assert store.status_counts[TaskStatus.COMPLETED] == 1
+
+        store["done-2"].completed_at = datetime(2000, 1, 1)
+        assert store.evict_expired() == 1
+        assert list(store) == ["running"]
+
+    @pytest.mark.asyncio
+    async def test_evicted_entries_are_reloaded_from_storage(self, mock_agent_service, mock_llm_service):
+        """Test status lookups fall back to persisted plans and executions missing from memory"""
+        plan = WorkflowPlan(workflow_id="wf", title="Stored", description="", steps=[{"step_id": "step-1"}])
+        execution = TaskExecution(task_id="step-1", workflow_id="wf", agent_id="agent-1", status=TaskStatus.COMPLETED)
+        persistence = Mock()
+        persistence.get_tasks_by_status = AsyncMock(return_value=[])
+        persistence.load_workflow_plan = AsyncMock(return_value=plan)
+        persistence.load_task_execution = AsyncMock(return_value=execution)
+        service = TaskService(mock_agent_service, mock_llm_service, persistence)
+
+        status = await service.get_workflow_status("wf")
+
+        assert status["steps"] == {"step-1": {"status": "completed", "start_time": None, "end_time": None}}
+        assert service.workflow_plans["wf"] is plan
+        assert service.task_executions["step-1"] is execution
+        assert (await service.get_task_status("step-1"))["status"] == "completed"
+        persistence.load_task_execution.assert_awaited_once_with("step-1")
+
+    def test_execution_snapshot_for_llm_is_compact(self):
+        """Test recovery prompts carry a fixed summary, not the full task data and result"""
+        execution = TaskExecution(
+            task_id="task-1",
+            workflow_id="wf",
+            agent_id="agent-1",
+            status=TaskStatus.FAILED,
+            task_data={"inputs": "x" * 10000},
+            result={"rows": list(range(1000))},
+            error="timeout",
+            started_at=datetime(2030, 1, 1, 0, 0, 0),
+            completed_at=datetime(2030, 1, 1, 0, 0, 5),
+        )
+
+        assert execution.snapshot_for_llm() == {
+            "status": "failed",
+            "agent_id": "agent-1",
+            "retries": 0,
+            "error": "timeout",
+            "started_at": "2030-01-01T00:00:00",
+            "completed_at": "2030-01-01T00:00:05",
+            "duration_s": 5.0,
+        }
+
+    @pytest.mark.asyncio
+    async def test_workflow_creation_rejects_malformed_plan(self, task_service, mock_llm_service):
+        """Test invalid JSON or a wrongly shaped plan is reported as a format error"""
+        for content in ("not json", json.dumps({"steps": "step-1"})):
+            mock_llm_service.generate_planning_workflow = AsyncMock(return_value=Mock(content=content))
+
+            with pytest.raises(ValueError, match="Invalid workflow plan format"):
+                await task_service.create_workflow_from_request("Do something")
+
+        mock_llm_service.generate_planning_workflow = AsyncMock(return_value=Mock(content="{}"))
+        plan = await task_service.create_workflow_from_request("Do something")
+        assert (plan.title, plan.steps, plan.metadata["estimated_duration"]) == ("Generated Workflow", [], 0)
+
+    @pytest.mark.asyncio
+    async def test_workflow_creation_accepts_null_and_numeric_fields(self, task_service, mock_llm_service):
+        """Test null title/description fall back to defaults and a numeric workflow id is kept as a string"""
+        content = json.dumps({"workflow_id": 42, "title": None, "description": None, "steps": []})
+        mock_llm_service.generate_planning_workflow = AsyncMock(return_value=Mock(content=content))
+
+        plan = await task_service.create_workflow_from_request("Do something")
+
+        assert (plan.workflow_id, plan.title, plan.description) == ("42", "Generated Workflow", "")
+
+    def test_workflow_status_priority(self, task_service):
+        """Test the overall status follows failed > cancelled > running > completed > pending"""
+        cases = [
+            (["completed", "running", "failed"], "failed"),
+            (["running", "cancelled"], "cancelled"),
+            (["pending", "running", "completed"], "running"),
+            (["completed", "completed"], "completed"),
+            (["completed", "pending"], "pending"),
+            ([], "completed"),
+        ]
+        for statuses, expected in cases:
+            step_statuses = {f"step-{i}": {"status": status} for i, status in enumerate(statuses)}
+            assert task_service._calculate_workflow_status(step_statuses) == expected
+
+    @pytest.mark.asyncio
+    async def test_retry_reuses_execution_record(self, task_service, mock_agent_service):
+        """Test a retried step keeps its execution record, agent and history"""
+        mock_agent_service.execute_agent_task = AsyncMock(side_effect=[RuntimeError("flaky"), {"ok": True}])
+        step = {"step_id": "step-1", "action": "fetch", "timeout": 30}
+
+        with pytest.raises(RuntimeError):
+            await task_service._execute_step(step, "agent-7", IntelligenceLevel.ADAPTIVE, "wf")
+        execution = task_service.task_executions["step-1"]
+        execution.llm_interactions.append({"type": "error_recovery"})
+
+        result = await task_service._modify_and_retry_step(step, {"timeout": 60}, "agent-7", "wf")
+
+        assert result["status"] == "completed"
+        assert task_service.task_executions["step-1"] is execution
+        assert (execution.workflow_id, execution.retries, execution.error) == ("wf", 1, None)
+        assert execution.task_data["timeout"] == 60
+        assert execution.llm_interactions == [{"type": "error_recovery"}]
+        assert mock_agent_service.execute_agent_task.await_args.kwargs["agent_id"] == "agent-7"
+        assert task_service.task_executions.status_counts[TaskStatus.FAILED] == 0
+
+    @pytest.mark.asyncio
+    async def test_retry_recreates_evicted_execution_record(self, task_service, mock_agent_service):
+        """Test a retry still runs after the failed execution was evicted from the bounded store"""
+        mock_agent_service.execute_agent_task = AsyncMock(side_effect=[RuntimeError("flaky"), {"ok": True}])
+        step = {"step_id": "step-1", "action": "fetch"}
+
+        with pytest.raises(RuntimeError):
+            await task_service._execute_step(step, "agent-7", IntelligenceLevel.ADAPTIVE, "wf")
+        del task_service.task_executions["step-1"]
+
+        result = await task_service._modify_and_retry_step(step, {}, "agent-7", "wf")
+
+        execution = task_service.task_executions["step-1"]
+        assert result["status"] == "completed"
+        assert (execution.workflow_id, execution.agent_id, execution.retries) == ("wf", "agent-7", 1)
+        assert execution.intelligence_level is IntelligenceLevel.BASIC
+
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_plans_share_one_llm_call(self, task_service, mock_llm_service):
+        """Test concurrent identical planning requests are coalesced"""
+        release = asyncio.Event()
+
+        async def slow_plan(request, context):
+            await release.wait()
+            return Mock(content=json.dumps({"workflow_id": "wf-shared", "steps": []}))
+
+        mock_llm_service.generate_planning_workflow = AsyncMock(side_effect=slow_plan)
+
+        first = asyncio.create_task(task_service.create_workflow_from_request("Plan it", {"b": 1, "a": 2}))
+        second = asyncio.create_task(task_service.create_workflow_from_request("Plan it", {"a": 2, "b": 1}))
+        await asyncio.sleep(0.01)
+        release.set()
+
+        assert (await first) is (await second)
+        mock_llm_service.generate_planning_workflow.assert_awaited_once()
+        assert task_service._planning_inflight == {}
+
+    def test_llm_interaction_history_is_capped(self):
+        """Test an execution keeps only its most recent LLM interactions"""
+        execution = TaskExecution(task_id="task-1", workflow_id="wf", agent_id="agent-1")
+
+        for attempt in range(5):
+            execution.record_llm_interaction({"attempt": attempt}, limit=3)
+
+        assert execution.llm_interactions == [{"attempt": 2}, {"attempt": 3}, {"attempt": 4}]
+
+    @pytest.mark.asyncio
+    async def test_delegation_schedules_dependents_and_dynamic_steps(self, task_service):
+        """Test delegated execution runs branches concurrently and picks up steps added mid-run"""
+        steps = [
+            {"step_id": "fetch-a"},
+            {"step_id": "fetch-b"},
+            {"step_id": "merge", "dependencies": ["fetch-a", "fetch-b"]},
+            {"step_id": "blocked", "dependencies": ["missing"]},
+        ]
+        plan = WorkflowPlan(workflow_id="wf", title="Fan-in", description="", steps=steps)
+        task_service.workflow_plans["wf"] = plan
+        task_service._create_agents_for_workflow = AsyncMock(return_value={s["step_id"]: "agent" for s in steps})
+        both_started = asyncio.Barrier(2)
+        finished = []
+
+        async def fake_execute(step, agent_id, intelligence_level, workflow_id):
+            if step["step_id"] in ("fetch-a", "fetch-b"):
+                await asyncio.wait_for(both_started.wait(), timeout=1)
+            if step["step_id"] == "merge":
+                plan.steps.append({"step_id": "report", "dependencies": ["merge"], "target_agent_id": "helper"})
+            finished.append((step["step_id"], agent_id))
+            return {"status": "completed"}
+
+        task_service._execute_step_with_delegation = fake_execute
+
+        result = await task_service.execute_workflow_with_delegation("wf")
+
+        assert result["status"] == "completed"
+        assert result["successful_steps"] == 4
+        assert result["launched_steps"] == 4
+        assert finished[-2:] == [("merge", "agent"), ("report", "helper")]
+        assert "blocked" not in result["results"]
+
+    @pytest.mark.asyncio
+    async def test_task_execution_writes_are_batched(self, mock_agent_service, mock_llm_service):
+        """Test queued execution updates collapse to the latest state and are written in one batch"""
+        persistence = Mock()
+        persistence.save_task_executions_batch = AsyncMock(return_value=True)
+        service = TaskService(mock_agent_service, mock_llm_service, persistence)
+        first = TaskExecution(task_id="task-1", workflow_id="wf", agent_id="agent-1")
+        second = TaskExecution(task_id="task-2", workflow_id="wf", agent_id="agent-1")
+
+        await service._persist_task_execution(first)
+        await service._persist_task_execution(second)
+        first.status = TaskStatus.COMPLETED
+        await service._persist_task_execution(first)
+        await service._persist_worker_task
+
+        persistence.save_task_executions_batch.assert_awaited_once_with([first, second])
+        assert service._persist_pending == {}
+        assert service._persist_worker_task is None
+
+    @pytest.mark.asyncio
+    async def test_close_writes_queued_task_executions(self, mock_agent_service, mock_llm_service):
+        """Test shutdown flushes executions still waiting for the next persist window"""
+        persistence = Mock()
+        persistence.save_task_executions_batch = AsyncMock(return_value=True)
+        service = TaskService(mock_agent_service, mock_llm_service, persistence)
+        service._persist_window = 10
+        execution = TaskExecution(task_id="task-1", workflow_id="wf", agent_id="agent-1")
+
+        await service._persist_task_execution(execution)
+        await service.close()
+
+        persistence.save_task_executions_batch.assert_awaited_once_with([execution])
+        service._persist_worker_task.cancel()
+
+    @pytest.mark.asyncio
+    async def test_recovery_strategy_is_reused_for_same_failure_kind(self, task_service):
+        """Test a repeated failure of the same step shape and error type skips the LLM"""
+        recovery = {"recovery_strategies": [{"strategy": "retry_with_backoff", "parameters": {"max_retries": 1}}]}
+        task_service._recovery_batcher.submit = AsyncMock(return_value=Mock(content=json.dumps(recovery)))
+        task_service._retry_step_with_backoff = AsyncMock(return_value={"status": "completed"})
+        step = {"step_id": "step-1", "agent_type": "fetcher", "action": "fetch"}
+
+        await task_service._handle_step_failure(step, TimeoutError("slow"), IntelligenceLevel.ADAPTIVE, "agent-1", "wf")
+        await task_service._handle_step_failure(
+            {**step, "step_id": "step-2"}, TimeoutError("slower"), IntelligenceLevel.ADAPTIVE, "agent-2", "wf"
+        )
+        await task_service._handle_step_failure(step, ValueError("bad input"), IntelligenceLevel.ADAPTIVE, "agent-1", "wf")
+
+        assert task_service._recovery_batcher.submit.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_step_specific_recovery_strategy_is_not_reused(self, task_service):
+        """Test a modify_and_retry reply is never replayed for a different step"""
+        recovery = {"recovery_strategies": [{"strategy": "modify_and_retry", "parameters": {"inputs": {"url": "a"}}}]}
+        task_service._recovery_batcher.submit = AsyncMock(return_value=Mock(content=json.dumps(recovery)))
+        task_service._modify_and_retry_step = AsyncMock(return_value=None)
+        step = {"step_id": "step-1", "agent_type": "fetcher", "action": "fetch"}
+
+        await task_service._handle_step_failure(step, TimeoutError("slow"), IntelligenceLevel.ADAPTIVE, "agent-1", "wf")
+        await task_service._handle_step_failure(
+            {**step, "step_id": "step-2"}, TimeoutError("slow"), IntelligenceLevel.ADAPTIVE, "agent-2", "wf"
+        )
+
+        assert task_service._recovery_batcher.submit.await_count == 2
+        assert task_service._recovery_cache == {}
+
+    @pytest.mark.asyncio
+    async def test_empty_recovery_reply_is_not_reused(self, task_service):
+        """Test a reply without strategies doesn't block later LLM recovery for similar steps"""
+        task_service._recovery_batcher.submit = AsyncMock(return_value=Mock(content=json.dumps({"recovery_strategies": []})))
+        step = {"step_id": "step-1", "agent_type": "fetcher", "action": "fetch"}
+
+        await task_service._handle_step_failure(step, TimeoutError("slow"), IntelligenceLevel.ADAPTIVE, "agent-1", "wf")
+        await task_service._handle_step_failure(step, TimeoutError("slow"), IntelligenceLevel.ADAPTIVE, "agent-1", "wf")
+
+        assert task_service._recovery_batcher.submit.await_count == 2
+        assert task_service._recovery_cache == {}
+
+    @pytest.mark.asyncio
+    async def test_reused_recovery_strategy_is_logged_as_cached(self, task_service):
+        """Test a cache hit is recorded on the execution as cached, not as a fresh LLM call"""
+        recovery = {"recovery_strategies": [{"strategy": "retry_with_backoff", "parameters": {}}]}
+        task_service._recovery_batcher.submit = AsyncMock(return_value=Mock(content=json.dumps(recovery)))
+        task_service._retry_step_with_backoff = AsyncMock(return_value={"status": "completed"})
+        execution = TaskExecution(task_id="step-1", workflow_id="wf", agent_id="agent-1")
+        task_service.task_executions["step-1"] = execution
+        step = {"step_id": "step-1", "agent_type": "fetcher", "action": "fetch"}
+
+        await task_service._handle_step_failure(step, TimeoutError("slow"), IntelligenceLevel.ADAPTIVE, "agent-1", "wf")
+        await task_service._handle_step_failure(step, TimeoutError("slow"), IntelligenceLevel.ADAPTIVE, "agent-1", "wf")
+
+        assert [interaction["cached"] for interaction in execution.llm_interactions] == [False, True]
+
+    def test_execution_order_is_reused_until_steps_change(self, task_service):
+        """Test a plan is sorted once per shape and re-sorted after a step is added"""
+        steps = [{"step_id": "step-1"}, {"step_id": "step-2", "dependencies": ["step-1"]}]
+        plan = WorkflowPlan(workflow_id="wf", title="Chain", description="", steps=steps)
+        task_service._create_task_dependencies(steps)
+
+        first = task_service._plan_execution_order(plan)
+        assert task_service._plan_execution_order(plan)[0] is first[0]
+
+        plan.steps.append({"step_id": "step-3", "dependencies": ["step-2"]})
+        task_service._create_task_dependencies(plan.steps)
+        ordered, cyclic = task_service._plan_execution_order(plan)
+
+        assert [s["step_id"] for s in ordered] == ["step-1", "step-2", "step-3"]
+        assert cyclic == []
+
+    def test_execution_order_is_recomputed_when_shared_dependencies_change(self, task_service):
+        """Test a later plan reusing step ids invalidates an earlier plan's cached order"""
+        steps = [{"step_id": "step-1"}, {"step_id": "step-2", "dependencies": ["step-1"]}]
+        plan = WorkflowPlan(workflow_id="wf", title="Chain", description="", steps=steps)
+        task_service._create_task_dependencies(steps)
+        task_service._plan_execution_order(plan)
+
+        task_service._create_task_dependencies([{"step_id": "step-1", "dependencies": ["step-2"]}])
+        ordered, cyclic = task_service._plan_execution_order(plan)
+
+        assert ordered == []
+        assert [s["step_id"] for s in cyclic] == ["step-1", "step-2"]
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
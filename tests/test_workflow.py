@@ -2,8 +2,9 @@
 
 import pytest
 from datetime import datetime
-from app.models.schemas import WorkflowCreate, WorkflowStatus
+from app.models.schemas import AgentResponse, WorkflowCreate, WorkflowStatus
 from app.services.workflow_service import WorkflowService
+from app.utils.errors import WorkflowAlreadyExistsError
 
 
 @pytest.fixture
@@ -132,6 +133,17 @@ class TestWorkflowService:
         assert stats["idle_agents"] == 0
         assert stats["error_agents"] == 0
 
+    @pytest.mark.asyncio
+    async def test_workflow_stats_count_agents_by_status(self, workflow_service, sample_workflow_data):
+        """Test agent status counts in workflow statistics."""
+        workflow = await workflow_service.create_workflow(sample_workflow_data)
+        for status in ("running", "running", "idle", "error", "paused"):
+            workflow.agents.append(AgentResponse(id=status, name=f"{status} agent", workflow_id=workflow.id, status=status))
+
+        stats = await workflow_service.get_workflow_stats(workflow.id)
+
+        assert (stats["active_agents"], stats["idle_agents"], stats["error_agents"]) == (2, 1, 1)
+
     @pytest.mark.asyncio
     async def test_update_workflow_status(self, workflow_service, sample_workflow_data):
         """Test updating workflow status."""
@@ -155,3 +167,33 @@ class TestWorkflowService:
         # Try to create another with same name - should raise exception
         with pytest.raises(Exception):  # WorkflowAlreadyExistsError
             await workflow_service.create_workflow(sample_workflow_data)
+
+    @pytest.mark.asyncio
+    async def test_workflow_name_freed_by_rename_and_delete(self, workflow_service, sample_workflow_data):
+        """Test renamed and deleted workflows release their names for reuse."""
+        workflow = await workflow_service.create_workflow(sample_workflow_data)
+        await workflow_service.update_workflow(workflow.id, {"name": "Renamed Workflow"})
+
+        reused = await workflow_service.create_workflow(sample_workflow_data)
+        with pytest.raises(Exception):
+            await workflow_service.create_workflow(WorkflowCreate(name="Renamed Workflow"))
+
+        await workflow_service.delete_workflow(reused.id)
+        recreated = await workflow_service.create_workflow(sample_workflow_data)
+        assert recreated.name == sample_workflow_data.name
+
+    @pytest.mark.asyncio
+    async def test_rename_onto_existing_name_is_rejected(self, workflow_service):
+        """Test a rename cannot take another workflow's name or corrupt the name index."""
+        first = await workflow_service.create_workflow(WorkflowCreate(name="x"))
+        second = await workflow_service.create_workflow(WorkflowCreate(name="b"))
+
+        with pytest.raises(WorkflowAlreadyExistsError):
+            await workflow_service.update_workflow(second.id, {"name": "x"})
+        await workflow_service.update_workflow(second.id, {"name": "y"})
+        with pytest.raises(Exception):
+            await workflow_service.create_workflow(WorkflowCreate(name="x"))
+
+        names = sorted(w.name for w in (await workflow_service.list_workflows()).workflows)
+        assert names == ["x", "y"]
+        assert workflow_service._names == {"x": first.id, "y": second.id}